@@ -1,8 +1,8 @@
-from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, status, Query, Body
 from bson import ObjectId
 
+from app.core.responses import standard_response
 from app.crud.crud_user import user as crud_user
 from app.models.user import UserUpdate
 from app.schemas.user import UserRoleUpdate
@@ -15,14 +15,6 @@ from app.crud.crud_answer import answer as crud_answer
 
 router = APIRouter()  # No dependencies, open access
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/users/", response_model=dict)
 async def list_users(
     query: Optional[str] = Query(None, description="Search by email or name"),
@@ -197,13 +189,15 @@ async def delete_user(
 async def list_questions(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="Set to false to skip counting; total is then null")
 ):
     """
     List all questions (admin only, with optional status filter)
     """
-    questions = await crud_question.get_multi(skip=skip, limit=limit)
-    total = await crud_question.collection.count_documents({})
+    questions, total = await crud_question.get_page(
+        skip=skip, limit=limit, status=status, include_total=include_total
+    )
     return standard_response(
         True,
         data={"items": questions, "total": total, "skip": skip, "limit": limit},
@@ -280,17 +274,15 @@ async def delete_question_admin(
 async def list_answers(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="Set to false to skip counting; total is then null")
 ):
     """
     List all answers (admin only, with optional status filter)
     """
-    if status:
-        answers = await crud_answer.get_by_status(status, skip=skip, limit=limit)
-        total = await crud_answer.collection.count_documents({"status": status})
-    else:
-        answers = await crud_answer.collection.find().sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
-        total = await crud_answer.collection.count_documents({})
+    answers, total = await crud_answer.get_page(
+        status=status, skip=skip, limit=limit, include_total=include_total
+    )
 
     # Convert ObjectId fields to strings for serialization
     answer_list = []
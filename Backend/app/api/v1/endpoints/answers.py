@@ -1,30 +1,24 @@
-from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from bson import ObjectId
 
+from app.core.responses import standard_response
 from app.core.security import get_current_active_user
 from app.models.answer import AnswerCreate, AnswerUpdate, Answer
 from app.crud.crud_answer import answer as crud_answer
 from app.crud.crud_question import question as crud_question
 from app.crud.crud_notification import notification as crud_notification
-from app.crud.crud_user import user as crud_user
+from app.crud.pagination import next_cursor
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/{question_id}/answers", response_model=dict)
 async def get_answers(
     question_id: str,
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Set to false to skip counting; total is then null")
 ):
     """
     Get all answers for a specific question
@@ -42,12 +36,19 @@ async def get_answers(
             detail="Question not found"
         )
     
-    answers = await crud_answer.get_by_question(question_id, skip=skip, limit=limit)
-    total = await crud_answer.collection.count_documents({"question_id": ObjectId(question_id)})
+    answers, total = await crud_answer.get_page_by_question(
+        question_id, skip=skip, limit=limit, cursor=cursor, include_total=include_total
+    )
     
     return standard_response(
         True,
-        data={"items": answers, "total": total, "skip": skip, "limit": limit},
+        data={
+            "items": answers,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": next_cursor(answers, "votes", limit)
+        },
         message="Answers retrieved successfully"
     )
 
@@ -73,20 +74,12 @@ async def create_answer(
             detail="Question not found"
         )
     
-    # Get user details
-    user = await crud_user.get(current_user["user_id"])
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # Create the answer
+    # The authenticated principal already carries the author's name
     answer = await crud_answer.create(
         answer_in=answer_in,
         question_id=question_id,
-        author_id=str(user.id),
-        author_name=f"{user.first_name} {user.last_name}"
+        author_id=current_user["user_id"],
+        author_name=f"{current_user['first_name']} {current_user['last_name']}"
     )
     
     # Update question answer count
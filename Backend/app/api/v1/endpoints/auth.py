@@ -2,6 +2,7 @@ from datetime import timedelta, datetime
 from fastapi import APIRouter, HTTPException, status, Request
 from typing import Any
 
+from app.core.responses import standard_response
 from app.core.security import (
     create_access_token,
     create_refresh_token,
@@ -15,25 +16,13 @@ from app.schemas.token import (
 from app.models.user import UserCreate, UserInDB
 from app.core.logging_config import get_logger
 from app.core.security import get_user_permissions
+from app.services.token_revocation import revocation_store
+from jose import JOSEError, jwt
 
 router = APIRouter()
 
 logger = get_logger(__name__)
 
-# In-memory token blacklist (for demo; use persistent storage in production)
-blacklisted_tokens = set()
-
-def is_token_blacklisted(token: str) -> bool:
-    return token in blacklisted_tokens
-
-def standard_response(success: bool, data: Any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.post("/login")
 async def login(login_data: LoginRequest):
     """
@@ -156,11 +145,12 @@ async def register(user_in: RegisterRequest):
             # Send verification email (implement this function)
             await send_verification_email(user.email, verification_token)
             
+            # 200 rather than 201: the envelope used to ignore status_code and
+            # clients were written against that; change it with the clients
             return standard_response(
                 True,
                 data={"email": user.email},
-                message="Registration successful! Please check your email to verify your account.",
-                status_code=status.HTTP_201_CREATED
+                message="Registration successful! Please check your email to verify your account."
             )
         
         # If no email verification required, log the user in
@@ -197,8 +187,7 @@ async def register(user_in: RegisterRequest):
                 "refresh_token": refresh_token,
                 "user": user_data
             },
-            message="Registration successful!",
-            status_code=status.HTTP_201_CREATED
+            message="Registration successful!"
         )
         
     except HTTPException as e:
@@ -217,7 +206,15 @@ async def logout(request: Request):
     """
     auth_header = request.headers.get("authorization")
     if not auth_header or not auth_header.lower().startswith("bearer "):
-        return standard_response(False, message="No token provided", status_code=400)
+        # 200 with success=False, as before: the admin client logs out with
+        # cookies only and treats any non-2xx response as an error
+        return standard_response(False, message="No token provided")
     token = auth_header.split(" ", 1)[1]
-    blacklisted_tokens.add(token)
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JOSEError:
+        # Invalid or already expired tokens can't authenticate anyway
+        return standard_response(True, message="Successfully logged out")
+    # Keep the revocation only as long as the token itself is valid
+    await revocation_store.revoke(token, datetime.utcfromtimestamp(payload["exp"]))
     return standard_response(True, message="Successfully logged out") 
\ No newline at end of file
@@ -7,6 +7,10 @@ from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.db.session import Database
 from app.services.storage import storage
+from app.services.image_derivatives import derivative_pipeline
+from app.services.view_counter import view_counter
+from app.crud.crud_user import principal_cache
+from app.crud.counts import count_cache
 
 router = APIRouter()
 
@@ -71,18 +75,15 @@ async def storage_health_check():
     Storage health check
     """
     try:
-        # Test storage connection by listing containers
-        
-        # This will raise an exception if the connection fails
-        await storage.container_client.get_container_properties()
+        # This will raise an exception if the backend is unreachable
+        backend_info = await storage.check()
         
         return standard_response(
             True,
             data={
                 "storage": {
                     "connected": True,
-                    "type": "Azure Blob Storage",
-                    "container": settings.AZURE_STORAGE_CONTAINER
+                    **backend_info
                 }
             },
             message="Storage healthy"
@@ -99,6 +100,23 @@ async def storage_health_check():
             message="Storage unhealthy"
         )
 
+@router.get("/metrics")
+async def metrics():
+    """
+    In-process counters for buffered writes and caches
+    """
+    return standard_response(
+        True,
+        data={
+            "view_counter": view_counter.stats(),
+            "principal_cache": principal_cache.stats(),
+            "count_cache": count_cache.stats(),
+            "storage": storage.stats(),
+            "derivatives": derivative_pipeline.stats()
+        },
+        message="Metrics fetched successfully"
+    )
+
 @router.get("/system")
 async def system_info():
     """
@@ -1,40 +1,33 @@
-from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from bson import ObjectId
 
+from app.core.responses import standard_response
 from app.core.security import get_current_active_user
 from app.models.notification import Notification
 from app.crud.crud_notification import notification as crud_notification
+from app.crud.pagination import next_cursor
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/", response_model=dict)
 async def get_notifications(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
     Get all notifications for the current user
     """
-    notifications = await crud_notification.get_by_user(
+    # Two round trips: the indexed page, then total and unread count together
+    notifications, total, unread_count = await crud_notification.get_page_by_user(
         user_id=current_user["user_id"],
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
     
-    total = await crud_notification.collection.count_documents({"user_id": ObjectId(current_user["user_id"])})
-    unread_count = await crud_notification.get_unread_count(current_user["user_id"])
-    
     return standard_response(
         True,
         data={
@@ -42,7 +35,8 @@ async def get_notifications(
             "total": total,
             "unread_count": unread_count,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor(notifications, "created_at", limit)
         },
         message="Notifications retrieved successfully"
     )
@@ -1,43 +1,47 @@
-from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from bson import ObjectId
 
+from app.core.responses import standard_response
 from app.core.security import get_current_active_user
 from app.models.question import QuestionCreate, QuestionUpdate, Question
 from app.models.answer import Answer
-from app.crud.crud_question import question as crud_question
+from app.crud.crud_question import question as crud_question, summary_projection
 from app.crud.crud_answer import answer as crud_answer
 from app.crud.crud_tag import tag as crud_tag
 from app.crud.crud_notification import notification as crud_notification
-from app.crud.crud_user import user as crud_user
+from app.crud.pagination import next_cursor
+from app.services.view_counter import view_counter
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/", response_model=dict)
 async def get_questions(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     tag: Optional[str] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Set to false to skip counting; total is then null"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to add to the summaries, e.g. content")
 ):
     """
-    Get all questions with optional filtering by tag or search
+    Get question summaries with optional filtering by tag or search
     """
-    questions = await crud_question.get_multi(skip=skip, limit=limit, tag=tag, search=search)
-    total = await crud_question.collection.count_documents({})
+    questions, total = await crud_question.get_page(
+        skip=skip, limit=limit, tag=tag, search=search, cursor=cursor, include_total=include_total,
+        projection=summary_projection(fields.split(",") if fields else ())
+    )
     
     return standard_response(
         True,
-        data={"items": questions, "total": total, "skip": skip, "limit": limit},
+        data={
+            "items": questions,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": next_cursor(questions, "created_at", limit)
+        },
         message="Questions retrieved successfully"
     )
 
@@ -49,19 +53,11 @@ async def create_question(
     """
     Create a new question
     """
-    # Get user details
-    user = await crud_user.get(current_user["user_id"])
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # Create the question
+    # The authenticated principal already carries the author's name
     question = await crud_question.create(
         question_in=question_in,
-        author_id=str(user.id),
-        author_name=f"{user.first_name} {user.last_name}"
+        author_id=current_user["user_id"],
+        author_name=f"{current_user['first_name']} {current_user['last_name']}"
     )
     
     # Update tag question counts
@@ -95,8 +91,8 @@ async def get_question(
             detail="Question not found"
         )
     
-    # Increment view count
-    await crud_question.increment_views(question_id)
+    # Increment view count (buffered, flushed to the database in bulk)
+    await view_counter.increment(question_id)
     
     # Get answers for this question
     answers = await crud_answer.get_by_question(question_id)
@@ -1,26 +1,20 @@
-from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from bson import ObjectId
 
+from app.core.responses import standard_response
 from app.core.security import get_current_active_user
-from app.crud.crud_question import question as crud_question
+from app.crud.crud_question import summary_projection
+from app.services.search import search_backend
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/", response_model=dict)
 async def search_questions(
     q: str = Query(..., min_length=1, description="Search query"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to add to the summaries, e.g. content")
 ):
     """
     Search questions by title and content
@@ -31,13 +25,8 @@ async def search_questions(
             detail="Search query cannot be empty"
         )
     
-    questions = await crud_question.search(q.strip(), skip=skip, limit=limit)
-    total = await crud_question.collection.count_documents({
-        "$or": [
-            {"title": {"$regex": q.strip(), "$options": "i"}},
-            {"content": {"$regex": q.strip(), "$options": "i"}}
-        ]
-    })
+    projection = summary_projection(fields.split(",") if fields else ())
+    questions, total = await search_backend.search(q.strip(), skip=skip, limit=limit, projection=projection)
     
     return standard_response(
         True,
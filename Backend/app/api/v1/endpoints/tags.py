@@ -1,23 +1,17 @@
-from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from bson import ObjectId
 
+from app.core.responses import standard_response
 from app.core.security import get_current_active_user
 from app.models.tag import Tag
 from app.crud.crud_tag import tag as crud_tag
-from app.crud.crud_question import question as crud_question
+from app.crud.crud_question import question as crud_question, summary_projection
+from app.crud.counts import count_cache
+from app.crud.pagination import next_cursor
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/", response_model=dict)
 async def get_tags(
     skip: int = Query(0, ge=0),
@@ -32,7 +26,8 @@ async def get_tags(
     else:
         tags = await crud_tag.get_multi(skip=skip, limit=limit)
     
-    total = await crud_tag.collection.count_documents({})
+    # Estimated from collection metadata and cached briefly
+    total = await count_cache.count(crud_tag.collection, {})
     
     return standard_response(
         True,
@@ -59,16 +54,28 @@ async def get_popular_tags(
 async def get_questions_by_tag(
     tag: str,
     skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Set to false to skip counting; total is then null"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to add to the summaries, e.g. content")
 ):
     """
     Get all questions under a specific tag
     """
-    questions = await crud_question.get_by_tag(tag, skip=skip, limit=limit)
-    total = await crud_question.collection.count_documents({"tags": tag})
+    questions, total = await crud_question.get_page(
+        skip=skip, limit=limit, tag=tag, cursor=cursor, include_total=include_total,
+        projection=summary_projection(fields.split(",") if fields else ())
+    )
     
     return standard_response(
         True,
-        data={"items": questions, "total": total, "skip": skip, "limit": limit, "tag": tag},
+        data={
+            "items": questions,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "tag": tag,
+            "next_cursor": next_cursor(questions, "created_at", limit)
+        },
         message=f"Questions for tag '{tag}' retrieved successfully"
     ) 
\ No newline at end of file
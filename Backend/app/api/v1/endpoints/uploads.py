@@ -1,187 +1,449 @@
 import os
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status
+import re
+import hashlib
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from typing import Optional, List
-from app.core.security import get_current_active_user
+from app.core.responses import standard_response
+from app.core.security import get_current_active_user, create_upload_grant_token, decode_upload_grant_token
 from app.core.config import settings
+from app.core.exceptions import BadRequestException
+from app.core.file_response import file_response
+from app.core.timing import StageTimer
+from app.services.mime_sniffer import validate_content_type
+from app.services.image_derivatives import derivative_pipeline, get_derivative_owner
 from app.services.storage import storage
+from app.services.upload_service import store_upload, store_duplicate, is_stored, delete_upload
+from app.services.upload_stream import MultipartFileStream
+from app.crud.crud_upload import upload as crud_upload
+from app.crud.pagination import next_cursor
+from app.models.upload import Upload, UploadCreate, UploadInDB
+from app.schemas.upload import UploadGrantRequest, UploadCommitRequest
 from app.models.user import UserInDB
-from datetime import datetime
+from app.models.enums import UserRole
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
+SHA256_HEX = re.compile(r"[0-9a-f]{64}")
 
-@router.post("/")
+def file_view(upload: UploadInDB, **extra) -> Upload:
+    """Upload record plus signed download URLs for it and its derivatives"""
+    view = Upload(**upload.model_dump(), url=storage.file_url(upload.file_id), **extra)
+    for derivative in view.derivatives.values():
+        derivative.url = storage.file_url(derivative.file_id)
+    return view
+
+@router.post(
+    "/",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"]
+                    }
+                }
+            }
+        }
+    }
+)
 async def upload_file(
-    file: UploadFile = File(...),
+    request: Request,
     folder: Optional[str] = None,
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Upload a file to the storage
+    Upload a file to the storage.
+
+    The multipart body is streamed into staged blob blocks of
+    UPLOAD_BLOCK_SIZE bytes, so only one block is held in memory per upload
+    and oversized files are rejected as soon as they cross MAX_UPLOAD_SIZE
+    or the user's remaining quota.
+    
+    The first MIME_SNIFF_BYTES are sniffed in the worker process pool before
+    anything is staged, so content that contradicts its declared type is
+    rejected (415) without transferring the rest of the body. Per-stage
+    timings are returned in the Server-Timing header.
+    
+    Clients may declare the file's SHA-256 (hex) in X-Content-SHA256. If
+    those bytes are already stored, the body is hashed without being staged
+    and the upload points at the stored file, so a repeat upload writes
+    nothing to storage. Either way the body must match the declared digest
+    (400 otherwise).
     """
-    # Check file size
-    file.file.seek(0, 2)  # Move to the end of the file
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset file pointer
+    declared_digest = request.headers.get("x-content-sha256")
+    if declared_digest is not None:
+        declared_digest = declared_digest.strip().lower()
+        if not SHA256_HEX.fullmatch(declared_digest):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="X-Content-SHA256 must be a hex-encoded SHA-256 digest"
+            )
     
-    if file_size > settings.MAX_UPLOAD_SIZE:
+    timer = StageTimer()
+    with timer.stage("quota"):
+        usage = await crud_upload.get_usage(current_user["user_id"])
+    remaining = settings.UPLOAD_QUOTA_BYTES - usage["bytes"]
+    if remaining <= 0:
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE} bytes"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Upload quota exceeded"
         )
     
-    # Read the file content (no MIME type detection)
-    file_content = await file.read()
+    file_stream = MultipartFileStream(request, settings.UPLOAD_BLOCK_SIZE, min(settings.MAX_UPLOAD_SIZE, remaining))
+    with timer.stage("receive"):
+        await file_stream.start()
+        head = await file_stream.peek(settings.MIME_SNIFF_BYTES)
+    
+    # Check the declared content type against the file's leading bytes
+    with timer.stage("sniff"):
+        content_type = await validate_content_type(head, file_stream.content_type)
+    
+    # Hash while streaming so identical content can be stored once
+    hasher = hashlib.sha256()
+    
+    async def hashed_blocks():
+        async for block in file_stream.blocks():
+            hasher.update(block)
+            yield block
+    
+    def check_digest():
+        if declared_digest and hasher.hexdigest() != declared_digest:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File content does not match X-Content-SHA256"
+            )
+    
+    metadata = {"uploaded_by": current_user["user_id"], "original_filename": file_stream.filename}
     
     # Upload the file
     try:
-        from io import BytesIO
-        file_obj = BytesIO(file_content)
-        
-        # Use the file's provided content_type or a default
-        content_type = file.content_type or "application/octet-stream"
-        
-        result = await storage.upload_file(
-            file_data=file_obj,
-            filename=file.filename,
-            content_type=content_type,
-            folder=folder,
-            metadata={
-                "uploaded_by": current_user["user_id"],
-                "original_filename": file.filename
-            }
+        if declared_digest and await is_stored(declared_digest):
+            # Already stored: read and hash the body, but don't stage it
+            with timer.stage("hash"):
+                async for _ in hashed_blocks():
+                    pass
+                check_digest()
+            with timer.stage("commit"):
+                upload = await store_duplicate(
+                    declared_digest,
+                    original_filename=file_stream.filename,
+                    size=file_stream.size,
+                    folder=folder,
+                    content_type=content_type,
+                    user_id=current_user["user_id"],
+                    metadata=metadata
+                )
+            if upload is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="The stored copy of this file was deleted during the upload; upload it again"
+                )
+            deduplicated = True
+        else:
+            with timer.stage("stage"):
+                staged = await storage.stage_stream(hashed_blocks(), file_stream.filename, folder)
+            try:
+                check_digest()
+            except HTTPException:
+                await storage.discard_staged(staged)
+                raise
+            with timer.stage("commit"):
+                upload, deduplicated = await store_upload(
+                    staged,
+                    digest=hasher.hexdigest(),
+                    content_type=content_type,
+                    user_id=current_user["user_id"],
+                    metadata=metadata
+                )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-        
-        return standard_response(True, data=result, message="File uploaded successfully")
-        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading file: {str(e)}"
         )
+    
+    # Thumbnails are generated in the background
+    derivative_pipeline.enqueue(upload)
+    
+    logger.info(f"Uploaded {upload.file_id} ({upload.size} bytes): {timer.server_timing()}")
+    
+    return standard_response(
+        True,
+        data=file_view(upload, deduplicated=deduplicated),
+        message="File uploaded successfully",
+        headers={"Server-Timing": timer.server_timing()}
+    )
 
-@router.get("/")
-async def list_files(
-    folder: Optional[str] = None,
-    page: int = 1,
-    limit: int = 10,
+@router.post("/grant")
+async def create_upload_grant(
+    grant_in: UploadGrantRequest,
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    List all files in the storage
+    Grant a short-lived, write-only URL for uploading one file straight to storage.
+
+    The client PUTs the file to ``upload_url`` with the returned headers,
+    then calls /uploads/commit with ``grant``. No file bytes pass through
+    the API.
     """
-    try:
-        # In a real app, you would implement pagination with the Azure SDK
-        # For now, we'll return a simplified response
-        files = []
-        async for blob in storage.container_client.list_blobs(name_starts_with=folder):
-            file_info = await storage.get_file_info(blob.name)
-            if file_info:
-                files.append(file_info)
-        
-        # Apply pagination
-        start = (page - 1) * limit
-        end = start + limit
-        paginated_files = files[start:end]
-        
-        return standard_response(
-            True,
-            data={
-                "files": paginated_files,
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": len(files),
-                    "pages": (len(files) + limit - 1) // limit
-                }
-            },
-            message="Files listed successfully"
-        )
-        
-    except Exception as e:
+    if not storage.supports_direct_upload:
+        raise BadRequestException(f"Direct uploads are not supported by the {storage.name} storage backend")
+    
+    usage = await crud_upload.get_usage(current_user["user_id"])
+    if grant_in.size > min(settings.MAX_UPLOAD_SIZE, settings.UPLOAD_QUOTA_BYTES - usage["bytes"]):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error listing files: {str(e)}"
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE} bytes and your remaining quota is {max(0, settings.UPLOAD_QUOTA_BYTES - usage['bytes'])} bytes"
         )
+    
+    lifetime = timedelta(seconds=settings.UPLOAD_GRANT_TTL)
+    file_id, upload_url, headers = storage.create_upload_url(grant_in.filename, grant_in.folder, lifetime)
+    
+    # The grant outlives the URL so a slow upload can still be committed
+    grant = create_upload_grant_token(
+        {
+            "uid": current_user["user_id"],
+            "fid": file_id,
+            "name": grant_in.filename,
+            "ct": grant_in.content_type,
+            "size": grant_in.size,
+            "folder": grant_in.folder
+        },
+        expires_delta=lifetime * 2
+    )
+    
+    return standard_response(
+        True,
+        data={
+            "file_id": file_id,
+            "upload_url": upload_url,
+            "method": "PUT",
+            "headers": {**headers, "Content-Type": grant_in.content_type},
+            "expires_at": (datetime.utcnow() + lifetime).isoformat() + "Z",
+            "grant": grant
+        },
+        message="Upload grant created successfully"
+    )
 
-@router.get("/{file_id}")
-async def get_file(
-    file_id: str,
+@router.post("/commit")
+async def commit_upload(
+    commit_in: UploadCommitRequest,
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Get file information
+    Record a file uploaded through /uploads/grant.
+
+    The stored blob must match the size and content type the grant was
+    issued for; a mismatched blob is deleted.
     """
-    try:
-        file_info = await storage.get_file_info(file_id)
-        if not file_info:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="File not found"
-            )
-            
-        return standard_response(True, data=file_info, message="File info fetched successfully")
-        
-    except Exception as e:
+    claims = decode_upload_grant_token(commit_in.grant)
+    if not claims or claims.get("uid") != current_user["user_id"]:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error getting file: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired upload grant"
         )
+    
+    file_id = claims["fid"]
+    
+    # Committing twice is harmless
+    existing = await crud_upload.get_by_file_id(file_id)
+    if existing:
+        return standard_response(True, data=file_view(existing), message="Upload committed successfully")
+    
+    file_info = await storage.get_file_info(file_id)
+    if not file_info:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File has not been uploaded"
+        )
+    
+    if file_info["size"] != claims["size"] or file_info["content_type"] != claims["ct"]:
+        await storage.delete_file(file_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file does not match the size or content type it was granted for"
+        )
+    
+    usage = await crud_upload.get_usage(current_user["user_id"])
+    if usage["bytes"] + file_info["size"] > settings.UPLOAD_QUOTA_BYTES:
+        await storage.delete_file(file_id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Upload quota exceeded"
+        )
+    
+    metadata = {
+        "uploaded_by": current_user["user_id"],
+        "original_filename": claims["name"],
+        "content_type": claims["ct"],
+        "uploaded_at": datetime.utcnow().isoformat()
+    }
+    await storage.set_metadata(file_id, metadata)
+    
+    upload = await crud_upload.create(
+        UploadCreate(
+            file_id=file_id,
+            filename=file_info["filename"],
+            original_filename=claims["name"],
+            content_type=claims["ct"],
+            size=file_info["size"],
+            folder=claims.get("folder"),
+            metadata=metadata
+        ),
+        user_id=current_user["user_id"]
+    )
+    derivative_pipeline.enqueue(upload)
+    
+    return standard_response(True, data=file_view(upload), message="Upload committed successfully")
 
-@router.get("/{file_id}/download")
+@router.get("/")
+async def list_files(
+    folder: Optional[str] = None,
+    uploaded_by: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    page_token: Optional[str] = Query(None, description="next_page token from the previous response"),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    List files, newest first, one page at a time
+    """
+    uploads = await crud_upload.get_multi(folder=folder, uploaded_by=uploaded_by, limit=limit, cursor=page_token)
+    
+    return standard_response(
+        True,
+        data={
+            "files": [file_view(upload) for upload in uploads],
+            "pagination": {
+                "limit": limit,
+                "next_page": next_cursor(uploads, "created_at", limit)
+            }
+        },
+        message="Files listed successfully"
+    )
+
+@router.get("/usage")
+async def get_usage(
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get the current user's storage usage and quota
+    """
+    usage = await crud_upload.get_usage(current_user["user_id"])
+    
+    return standard_response(
+        True,
+        data={
+            "used_bytes": usage["bytes"],
+            "files": usage["files"],
+            "quota_bytes": settings.UPLOAD_QUOTA_BYTES,
+            "remaining_bytes": max(0, settings.UPLOAD_QUOTA_BYTES - usage["bytes"])
+        },
+        message="Storage usage fetched successfully"
+    )
+
+# File ids are storage paths and may contain "/", so they use the path
+# converter; the download route must be registered before the plain one
+@router.get("/{file_id:path}/download")
 async def download_file(
     file_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Download a file
+    Download a file.
+
+    Backends that serve their own downloads (local disk) stream the bytes
+    here, with Range support; otherwise a signed URL is returned. Image
+    derivatives are downloaded by their own file id.
+    
+    Deduplicated content is shared by several uploaders' records, so only
+    the caller's own record (name, type) is used; without one it is a 404.
     """
-    try:
-        file_info = await storage.get_file_info(file_id)
-        if not file_info:
+    upload = await crud_upload.get_owned(file_id, current_user["user_id"])
+    if upload:
+        media_type, filename = upload.content_type, upload.original_filename or upload.filename
+    else:
+        owner = await get_derivative_owner(file_id, current_user["user_id"])
+        if not owner:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
+        media_type, filename = owner[1].content_type, os.path.basename(file_id)
+    
+    if storage.serves_downloads:
+        path = storage.local_path(file_id)
+        if path is None or not path.is_file():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
-            
-        # In a real app, you would stream the file directly from Azure Blob Storage
-        # For now, we'll just return the download URL
-        return standard_response(True, data={"download_url": file_info["url"]}, message="Download URL fetched successfully")
+        return file_response(request, path, media_type, filename)
         
-    except Exception as e:
+    return standard_response(True, data={"download_url": storage.file_url(file_id)}, message="Download URL fetched successfully")
+
+@router.get("/{file_id:path}")
+async def get_file(
+    file_id: str,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get file information, including thumbnail and WebP derivatives of images
+    once they have been generated. Only the caller's own record is returned.
+    """
+    upload = await crud_upload.get_owned(file_id, current_user["user_id"])
+    if not upload:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error downloading file: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
         )
+        
+    return standard_response(True, data=file_view(upload), message="File info fetched successfully")
 
-@router.delete("/{file_id}")
+@router.delete("/{file_id:path}")
 async def delete_file(
     file_id: str,
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Delete a file
+    Delete a file.
+
+    Removes the caller's record for the file. Identical content uploaded by
+    others is shared, so the stored bytes are only deleted with the last
+    record that references them.
     """
+    upload = await crud_upload.get_by_file_id(file_id, current_user["user_id"])
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    if upload.uploaded_by and str(upload.uploaded_by) != current_user["user_id"] and current_user["role"] != UserRole.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to delete this file"
+        )
+    
     try:
-        # In a real app, you would check if the user has permission to delete this file
-        success = await storage.delete_file(file_id)
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="File not found"
-            )
-            
+        await delete_upload(upload)
         return standard_response(True, message="File deleted successfully")
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting file: {str(e)}"
-        ) 
\ No newline at end of file
+        )
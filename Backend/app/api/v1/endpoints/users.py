@@ -1,21 +1,13 @@
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 
 
+from app.core.responses import standard_response
 from app.core.security import get_current_active_user
 from app.models.user import  UserUpdate
 from app.crud.crud_user import user as crud_user
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/me")
 async def read_user_me(current_user: dict = Depends(get_current_active_user)):
     """
@@ -22,18 +22,69 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASH_WORKERS: int = 4  # Concurrent bcrypt operations off the event loop
+    PRINCIPAL_CACHE_SIZE: int = 10000  # Authenticated users cached per worker
+    PRINCIPAL_CACHE_TTL: float = 30.0  # seconds
+    TOKEN_REVOCATION_CAPACITY: int = 100000  # Bloom filter sizing (revoked, unexpired tokens)
+    TOKEN_REVOCATION_SYNC_INTERVAL: float = 5.0  # seconds between pulls of other workers' revocations
+    TOKEN_REVOCATION_REBUILD_INTERVAL: float = 3600.0  # seconds between full filter rebuilds
     
     # Database
     MONGODB_URL: str
     DATABASE_NAME: str = "runtime_traitors"
+    CREATE_INDEXES_ON_STARTUP: bool = False  # Apply app/db/indexes.py specs in lifespan
+    
+    # File storage: "azure" (Blob Storage) or "local" (files under LOCAL_STORAGE_PATH)
+    STORAGE_BACKEND: str = "azure"
+    LOCAL_STORAGE_PATH: str = "storage"
     
     # Azure Blob Storage
-    AZURE_STORAGE_ACCOUNT_NAME: str
-    AZURE_STORAGE_ACCOUNT_KEY: str
+    AZURE_STORAGE_ACCOUNT_NAME: Optional[str] = None
+    AZURE_STORAGE_ACCOUNT_KEY: Optional[str] = None
     AZURE_STORAGE_CONTAINER: str = "uploads"
+    # Full connection string, e.g. for Azurite; overrides account name/key
+    AZURE_STORAGE_CONNECTION_STRING: Optional[str] = None
+    AZURE_STORAGE_MAX_CONNECTIONS: int = 100  # Pooled HTTP connections shared by all blob clients
+    SAS_URL_LIFETIME: int = 3600  # seconds a signed blob URL stays valid
+    SAS_URL_REFRESH_FRACTION: float = 0.5  # re-sign once this fraction of the lifetime has passed
+    SAS_URL_CACHE_SIZE: int = 10000  # signed URLs cached per worker
     
     # File upload settings
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
+    UPLOAD_BLOCK_SIZE: int = 4 * 1024 * 1024  # Bytes buffered per staged blob block
+    UPLOAD_QUOTA_BYTES: int = 1024 * 1024 * 1024  # Per-user storage quota (1GB), read from the uploads collection
+    UPLOAD_GRANT_TTL: int = 900  # seconds a direct-to-storage upload grant stays valid
+    MIME_SNIFF_BYTES: int = 4096  # Leading bytes of each upload checked against its declared type
+    
+    # MIME sniffing on the upload path runs in this many processes
+    WORKER_PROCESSES: int = 2
+    
+    # Image derivatives, generated in the background for every uploaded image
+    THUMBNAIL_SIZE: int = 320  # Square thumbnail edge in pixels
+    WEBP_MAX_DIMENSION: int = 2048  # Longest edge of the WebP copy
+    WEBP_QUALITY: int = 80
+    IMAGE_DERIVATIVE_MAX_BYTES: int = 20 * 1024 * 1024  # Larger images get no derivatives
+    DERIVATIVE_QUEUE_SIZE: int = 1000  # Images waiting for processing before new ones are skipped
+    DERIVATIVE_PROCESSES: int = 1  # Own pool, so background renders never hold up upload sniffing
+    
+    # Blob garbage collection (scripts/collect_garbage.py)
+    BLOB_GC_GRACE_PERIOD: int = 24 * 3600  # seconds an unreferenced blob is kept, covering in-flight uploads
+    BLOB_GC_BATCH_SIZE: int = 500  # Records or unreferenced blobs resolved per batched lookup
+    
+    # Search: "text" (weighted Mongo text index), "regex" (no index required)
+    # or "memory" (in-process BM25 index built at startup)
+    SEARCH_BACKEND: str = "text"
+    
+    # Characters of a question's body stored as its list excerpt
+    QUESTION_EXCERPT_LENGTH: int = 200
+    
+    # Question view counting (buffered and flushed in bulk)
+    VIEW_COUNT_FLUSH_INTERVAL: float = 5.0  # seconds
+    VIEW_COUNT_MAX_PENDING: int = 1000  # distinct questions before an early flush
+    
+    # List totals (app/crud/counts.py): estimated when unfiltered, cached per tag/status
+    COUNT_CACHE_SIZE: int = 1000  # Filtered totals cached per worker
+    COUNT_CACHE_TTL: float = 60.0  # seconds before a cached total is recounted
     
     # Rate limiting
     RATE_LIMIT: int = 60
@@ -0,0 +1,90 @@
+import os
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import quote
+import anyio
+from fastapi import Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+class UnsatisfiableRange(Exception):
+    pass
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header into inclusive (start, end).
+
+    Returns None for headers we don't handle (multiple ranges, other units),
+    which RFC 9110 lets us answer with the full body.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise UnsatisfiableRange()
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise UnsatisfiableRange()
+    return start, end
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+async def _read_range(path: Path, start: int, end: int):
+    async with await anyio.open_file(path, "rb") as handle:
+        await handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def file_response(request: Request, path: Path, media_type: Optional[str], filename: str) -> Response:
+    """
+    Serve a file from disk, honouring single-range ``Range`` requests with 206.
+
+    Full-body responses use Starlette's FileResponse, which streams from
+    disk in chunks on a worker thread without loading the file.
+    """
+    size = os.stat(path).st_size
+    headers = {"Accept-Ranges": "bytes", "Content-Disposition": content_disposition(filename)}
+
+    range_header = request.headers.get("range")
+    try:
+        byte_range = parse_range(range_header, size) if range_header else None
+    except UnsatisfiableRange:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"}
+        )
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _read_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+def _default(obj: Any) -> Any:
+    """orjson fallback for the types endpoints put in their payloads"""
+    if isinstance(obj, BaseModel):
+        # One pass in pydantic-core; json_encoders on the *InDB models turn ObjectIds into str
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class APIResponse(JSONResponse):
+    """
+    JSON response rendered by orjson.
+
+    Endpoints return it directly, so FastAPI skips ``jsonable_encoder`` and
+    the stdlib encoder: datetimes and dicts are handled natively by orjson,
+    ObjectIds and models through ``_default``. Output matches what
+    ``jsonable_encoder`` produced (models by alias, ids as strings, naive
+    datetimes in ISO format), minus the whitespace.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def standard_response(
+    success: bool,
+    data: Any = None,
+    message: str = "",
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> APIResponse:
+    """The API's response envelope"""
+    return APIResponse(
+        {
+            "success": success,
+            "data": data,
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        },
+        status_code=status_code,
+        headers=headers
+    )
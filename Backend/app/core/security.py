@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, Union
 from jose import JWTError, JOSEError, jwt
@@ -8,6 +10,7 @@ from app.core.config import settings
 from app.models.user import UserInDB
 from app.crud.crud_user import user as crud_user
 from app.models.enums import UserRole, Permission
+from app.services.token_revocation import revocation_store
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -18,6 +21,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# bcrypt is deliberately slow (~100-300 ms) and releases the GIL, so hashing
+# runs on a bounded thread pool instead of blocking the event loop.
+# PASSWORD_HASH_WORKERS caps how many hashes run at once; the rest queue.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
 # JWT token handling
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -66,6 +85,21 @@ def create_access_token_from_refresh_token(refresh_token: str) -> str:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+# Upload grants: a signed claim set for one direct-to-storage upload. The
+# audience keeps them from ever being accepted as access tokens.
+UPLOAD_GRANT_AUDIENCE = "upload-grant"
+
+def create_upload_grant_token(claims: Dict[str, Any], expires_delta: timedelta) -> str:
+    return create_access_token({**claims, "aud": UPLOAD_GRANT_AUDIENCE}, expires_delta=expires_delta)
+
+def decode_upload_grant_token(token: str) -> Optional[Dict[str, Any]]:
+    try:
+        return jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], audience=UPLOAD_GRANT_AUDIENCE
+        )
+    except JOSEError:
+        return None
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
@@ -79,9 +113,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        # Check if token is blacklisted
-        from app.api.v1.endpoints.auth import is_token_blacklisted
-        if is_token_blacklisted(token):
+        # Check if token has been revoked (logout)
+        if await revocation_store.is_revoked(token):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been revoked",
@@ -97,8 +130,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
         if user_id is None:
             raise credentials_exception
             
-        # Get user from database
-        user = await crud_user.get(user_id)
+        # Get user from the principal cache, falling back to the database
+        user = await crud_user.get_principal(user_id)
         if user is None:
             raise credentials_exception
             
@@ -0,0 +1,22 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+class StageTimer:
+    """Wall-clock milliseconds per named stage of one request"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def server_timing(self) -> str:
+        """Value for a ``Server-Timing`` response header"""
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.stages.items())
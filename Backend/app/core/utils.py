@@ -1,5 +1,30 @@
 # Common utility functions for the application
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional
 
 def to_camel_case(snake_str: str) -> str:
     components = snake_str.split('_')
-    return components[0] + ''.join(x.title() for x in components[1:]) 
\ No newline at end of file
+    return components[0] + ''.join(x.title() for x in components[1:])
+
+def make_excerpt(text: str, length: int) -> str:
+    """First ``length`` characters of ``text`` with whitespace collapsed, cut at a word boundary"""
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0] or text[:length]
+    return cut.rstrip(" .,;:") + "…"
+
+def naive_utc(value: Optional[datetime]) -> datetime:
+    """``value`` as a naive UTC datetime, as Mongo stores them; now if it is None"""
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+async def next_or_none(iterator: AsyncIterator[Any]) -> Optional[Any]:
+    """Next item of an async iterator, or None once it is exhausted (for merge-joins)"""
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
@@ -0,0 +1,110 @@
+import time
+from typing import Any, Dict
+from bson import json_util
+from app.core.config import settings
+
+def _matches(document: Dict[str, Any], filter_query: Dict[str, Any]) -> bool:
+    for field, value in filter_query.items():
+        stored = document.get(field)
+        if stored != value and not (isinstance(stored, list) and value in stored):
+            return False
+    return True
+
+class CountCache:
+    """
+    Totals for list endpoints without an exact count on every request.
+
+    Unfiltered totals come from ``estimated_document_count`` (collection
+    metadata, no scan). Simple equality filters, like a tag or a status,
+    are counted exactly once and then kept as counters: CRUD writes
+    ``adjust`` every cached counter their document matches, and edits that
+    can move a document between filters ``invalidate`` the collection.
+    Entries expire after ``ttl`` seconds, which bounds any drift from
+    writes made by other workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # collection name -> {filter key: [expires_at, filter, count]}
+        self._counters: Dict[str, Dict[str, list]] = {}
+        self._size = 0
+        # Bumped by invalidate, so a count loaded across one isn't cached
+        self._generations: Dict[str, int] = {}
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cacheable(filter_query: Dict[str, Any]) -> bool:
+        """Only plain equality filters are kept as counters"""
+        return all(
+            not field.startswith("$") and not isinstance(value, (dict, list))
+            for field, value in filter_query.items()
+        )
+
+    @staticmethod
+    def _key(filter_query: Dict[str, Any]) -> str:
+        return json_util.dumps(filter_query, sort_keys=True)
+
+    async def count(self, collection, filter_query: Dict[str, Any]) -> int:
+        counters = self._counters.setdefault(collection.name, {})
+        key = self._key(filter_query)
+        entry = counters.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+
+        generation = self._generations.get(collection.name, 0)
+        if filter_query:
+            total = await collection.count_documents(filter_query)
+        else:
+            total = await collection.estimated_document_count()
+
+        if self._generations.get(collection.name, 0) == generation:
+            if key not in counters:
+                self._size += 1
+            counters[key] = [time.monotonic() + self.ttl, filter_query, total]
+            self._evict()
+        return total
+
+    def adjust(self, collection_name: str, document: Dict[str, Any], delta: int):
+        """Apply an insert (+1) or delete (-1) of ``document`` to the cached counters"""
+        # A count in flight may or may not include this write; don't cache it
+        self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+        for entry in self._counters.get(collection_name, {}).values():
+            if _matches(document, entry[1]):
+                entry[2] = max(entry[2] + delta, 0)
+
+    def invalidate(self, collection_name: str):
+        """Drop a collection's counters after an edit that can change which filters match"""
+        self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+        self._size -= len(self._counters.pop(collection_name, {}))
+
+    def _evict(self):
+        if self._size <= self.maxsize:
+            return
+        # Expired entries first, then the oldest of the largest collection
+        now = time.monotonic()
+        for counters in self._counters.values():
+            for key in [key for key, entry in counters.items() if entry[0] <= now]:
+                del counters[key]
+                self._size -= 1
+        while self._size > self.maxsize:
+            counters = max(self._counters.values(), key=len)
+            del counters[next(iter(counters))]
+            self._size -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": self._size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# Create a default instance for easy importing
+count_cache = CountCache(maxsize=settings.COUNT_CACHE_SIZE, ttl=settings.COUNT_CACHE_TTL)
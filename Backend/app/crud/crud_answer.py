@@ -1,9 +1,13 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from fastapi import HTTPException, status
 from app.models.answer import AnswerInDB, AnswerCreate, AnswerUpdate, Answer
 from app.db.session import get_collection
+from app.crud.counts import count_cache
+from app.crud.pagination import apply_cursor, paged_query, sort_spec
+from app.crud.readers import from_db, many_from_db
 
 class CRUDAnswer:
     def __init__(self):
@@ -20,20 +24,48 @@ class CRUDAnswer:
             return None
         answer_data = await self.collection.find_one({"_id": ObjectId(answer_id)})
         if answer_data:
-            return AnswerInDB(**answer_data)
+            return from_db(AnswerInDB, answer_data)
         return None
 
-    async def get_by_question(self, question_id: str, skip: int = 0, limit: int = 100) -> List[AnswerInDB]:
+    async def get_by_question(
+        self, question_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[AnswerInDB]:
         if not ObjectId.is_valid(question_id):
             return []
         
-        answers = []
-        cursor = self.collection.find({"question_id": ObjectId(question_id)}).sort("votes", -1).skip(skip).limit(limit)
+        filter_query = apply_cursor({"question_id": ObjectId(question_id)}, cursor, "votes")
         
-        async for answer_data in cursor:
-            answers.append(AnswerInDB(**answer_data))
+        db_cursor = self.collection.find(filter_query).sort(sort_spec("votes")).skip(0 if cursor else skip).limit(limit)
+        return many_from_db(AnswerInDB, await db_cursor.to_list(length=limit))
+
+    async def get_page_by_question(
+        self,
+        question_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ) -> Tuple[List[AnswerInDB], Optional[int]]:
+        """A page of a question's answers by votes (indexed find), plus their total (count_documents)"""
+        if not ObjectId.is_valid(question_id):
+            return [], 0
         
-        return answers
+        page = await paged_query(
+            self.collection, {"question_id": ObjectId(question_id)}, "votes",
+            skip=skip, limit=limit, cursor=cursor, include_total=include_total
+        )
+        return many_from_db(AnswerInDB, page.items), page.total
+
+    async def get_page(
+        self, status: Optional[str] = None, skip: int = 0, limit: int = 100, include_total: bool = True
+    ) -> Tuple[List[AnswerInDB], Optional[int]]:
+        """Newest answers, optionally with one status, plus their (cached) total"""
+        filter_query = {"status": status} if status else {}
+        page = await paged_query(
+            self.collection, filter_query, "created_at", skip=skip, limit=limit,
+            include_total=include_total, cache_total=True
+        )
+        return many_from_db(AnswerInDB, page.items), page.total
 
     async def create(self, answer_in: AnswerCreate, question_id: str, author_id: str, author_name: str) -> AnswerInDB:
         # Create answer data
@@ -44,12 +76,11 @@ class CRUDAnswer:
         answer_data["created_at"] = datetime.utcnow()
         answer_data["updated_at"] = datetime.utcnow()
         
-        # Insert into database
-        result = await self.collection.insert_one(answer_data)
+        # Insert into database; insert_one sets _id on answer_data
+        await self.collection.insert_one(answer_data)
+        count_cache.adjust("answers", answer_data, 1)
         
-        # Return the created answer
-        created_answer = await self.get(str(result.inserted_id))
-        return created_answer
+        return AnswerInDB(**answer_data)
 
     async def update(
         self, answer_id: str, answer_in: AnswerUpdate
@@ -57,31 +88,32 @@ class CRUDAnswer:
         if not ObjectId.is_valid(answer_id):
             return None
             
-        # Get existing answer
-        existing_answer = await self.get(answer_id)
-        if not existing_answer:
-            return None
-            
         # Prepare update data
         update_data = answer_in.dict(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow()
         
-        # Perform the update
-        result = await self.collection.update_one(
+        # Update and read back in one round trip; None if it doesn't exist
+        answer_data = await self.collection.find_one_and_update(
             {"_id": ObjectId(answer_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 1:
-            return await self.get(answer_id)
+        if "status" in update_data:
+            count_cache.invalidate("answers")
+        if answer_data:
+            return from_db(AnswerInDB, answer_data)
         return None
 
     async def delete(self, answer_id: str) -> bool:
         if not ObjectId.is_valid(answer_id):
             return False
             
-        result = await self.collection.delete_one({"_id": ObjectId(answer_id)})
-        return result.deleted_count > 0
+        # find_one_and_delete returns the document, so cached totals it counted in can drop it
+        answer_data = await self.collection.find_one_and_delete({"_id": ObjectId(answer_id)})
+        if not answer_data:
+            return False
+        count_cache.adjust("answers", answer_data, -1)
+        return True
 
     async def accept_answer(self, answer_id: str) -> bool:
         if not ObjectId.is_valid(answer_id):
@@ -112,30 +144,24 @@ class CRUDAnswer:
         if not ObjectId.is_valid(author_id):
             return []
         
-        answers = []
         cursor = self.collection.find({"author_id": ObjectId(author_id)}).sort("created_at", -1).skip(skip).limit(limit)
-        
-        async for answer_data in cursor:
-            answers.append(AnswerInDB(**answer_data))
-        
-        return answers
+        return many_from_db(AnswerInDB, await cursor.to_list(length=limit))
 
     async def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> List[AnswerInDB]:
-        answers = []
         cursor = self.collection.find({"status": status}).sort("created_at", -1).skip(skip).limit(limit)
-        async for answer_data in cursor:
-            answers.append(AnswerInDB(**answer_data))
-        return answers
+        return many_from_db(AnswerInDB, await cursor.to_list(length=limit))
 
     async def update_status(self, answer_id: str, status: str) -> Optional[AnswerInDB]:
         if not ObjectId.is_valid(answer_id):
             return None
-        result = await self.collection.update_one(
+        answer_data = await self.collection.find_one_and_update(
             {"_id": ObjectId(answer_id)},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
         )
-        if result.modified_count == 1:
-            return await self.get(answer_id)
+        count_cache.invalidate("answers")
+        if answer_data:
+            return from_db(AnswerInDB, answer_data)
         return None
 
 # Create a default instance for easy importing
@@ -0,0 +1,84 @@
+from typing import Optional, Dict, Any
+from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.db.session import get_collection
+
+class CRUDFileObject:
+    """
+    Content-addressed index of stored files.
+
+    One document per distinct SHA-256 digest, pointing at the single blob
+    that holds those bytes, with a count of the upload records sharing it.
+    """
+
+    def __init__(self):
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection("file_objects")
+        return self._collection
+
+    async def exists(self, digest: str) -> bool:
+        """Whether there is a live stored object for ``digest``"""
+        return await self.collection.find_one({"_id": digest, "refcount": {"$gt": 0}}, {"_id": 1}) is not None
+
+    async def acquire(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Take a reference to the stored object for ``digest``, if there is a live one"""
+        return await self.collection.find_one_and_update(
+            {"_id": digest, "refcount": {"$gt": 0}},
+            {"$inc": {"refcount": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def acquire_file(self, file_id: str) -> Optional[str]:
+        """Take a reference to the live stored object held in ``file_id``; returns its digest"""
+        file_object = await self.collection.find_one_and_update(
+            {"file_id": file_id, "refcount": {"$gt": 0}},
+            {"$inc": {"refcount": 1}},
+            projection={"_id": 1}
+        )
+        return file_object["_id"] if file_object else None
+
+    async def register(self, digest: str, file_id: str, size: int, content_type: str) -> bool:
+        """Record a newly stored object with one reference; False if the digest is already known"""
+        try:
+            await self.collection.insert_one({
+                "_id": digest,
+                "file_id": file_id,
+                "size": size,
+                "content_type": content_type,
+                "refcount": 1,
+                "created_at": datetime.utcnow()
+            })
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def release(self, digest: str) -> Optional[str]:
+        """
+        Drop one reference to ``digest``.
+
+        Returns the object's file_id once the last reference is gone, so the
+        caller can delete the blob; otherwise None.
+        """
+        file_object = await self.collection.find_one_and_update(
+            {"_id": digest},
+            {"$inc": {"refcount": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if file_object is None or file_object["refcount"] > 0:
+            return None
+
+        # acquire() only matches refcount > 0, so nothing can revive it now
+        result = await self.collection.delete_one({"_id": digest, "refcount": {"$lte": 0}})
+        return file_object["file_id"] if result.deleted_count else None
+
+    async def forget(self, file_id: str):
+        """Drop the index entry for a stored file that no longer exists"""
+        await self.collection.delete_many({"file_id": file_id})
+
+# Create a default instance for easy importing
+file_object = CRUDFileObject()
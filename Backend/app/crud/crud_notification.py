@@ -1,9 +1,12 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from fastapi import HTTPException, status
 from app.models.notification import NotificationInDB, NotificationCreate, NotificationUpdate, Notification
 from app.db.session import get_collection
+from app.crud.pagination import apply_cursor, paged_query, sort_spec
+from app.crud.readers import from_db, many_from_db
 
 class CRUDNotification:
     def __init__(self):
@@ -20,40 +23,41 @@ class CRUDNotification:
             return None
         notification_data = await self.collection.find_one({"_id": ObjectId(notification_id)})
         if notification_data:
-            # Convert ObjectId to string for JSON serialization
-            if "_id" in notification_data:
-                notification_data["_id"] = str(notification_data["_id"])
-            if "user_id" in notification_data:
-                notification_data["user_id"] = str(notification_data["user_id"])
-            if "related_question_id" in notification_data:
-                notification_data["related_question_id"] = str(notification_data["related_question_id"])
-            if "related_answer_id" in notification_data:
-                notification_data["related_answer_id"] = str(notification_data["related_answer_id"])
-            return NotificationInDB(**notification_data)
+            return from_db(NotificationInDB, notification_data)
         return None
 
-    async def get_by_user(self, user_id: str, skip: int = 0, limit: int = 100) -> List[NotificationInDB]:
+    async def get_by_user(
+        self, user_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[NotificationInDB]:
         if not ObjectId.is_valid(user_id):
             return []
         
-        notifications = []
-        cursor = self.collection.find({"user_id": ObjectId(user_id)}).sort("created_at", -1).skip(skip).limit(limit)
+        filter_query = apply_cursor({"user_id": ObjectId(user_id)}, cursor, "created_at")
         
-        async for notification_data in cursor:
-            # Convert ObjectId to string for JSON serialization
-            if "_id" in notification_data:
-                notification_data["_id"] = str(notification_data["_id"])
-            if "user_id" in notification_data:
-                notification_data["user_id"] = str(notification_data["user_id"])
-            if "related_question_id" in notification_data:
-                notification_data["related_question_id"] = str(notification_data["related_question_id"])
-            if "related_answer_id" in notification_data:
-                notification_data["related_answer_id"] = str(notification_data["related_answer_id"])
-            notifications.append(NotificationInDB(**notification_data))
+        db_cursor = self.collection.find(filter_query).sort(sort_spec("created_at")).skip(0 if cursor else skip).limit(limit)
+        return many_from_db(NotificationInDB, await db_cursor.to_list(length=limit))
+
+    async def get_page_by_user(
+        self, user_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[NotificationInDB], int, int]:
+        """
+        A page of a user's notifications with their total and unread count:
+        an indexed find for the page, then both counts in one ``$facet``
+        """
+        if not ObjectId.is_valid(user_id):
+            return [], 0, 0
         
-        return notifications
+        page = await paged_query(
+            self.collection, {"user_id": ObjectId(user_id)}, "created_at",
+            skip=skip, limit=limit, cursor=cursor, counts={"unread": {"is_read": False}}
+        )
+        return many_from_db(NotificationInDB, page.items), page.total, page.counts["unread"]
 
     async def create(self, notification_in: NotificationCreate, user_id: str, question_id: Optional[str] = None, answer_id: Optional[str] = None) -> NotificationInDB:
+        # Endpoints pass plain dicts; validate them into the model
+        if isinstance(notification_in, dict):
+            notification_in = NotificationCreate(**notification_in)
+        
         # Create notification data
         notification_data = notification_in.dict()
         notification_data["user_id"] = ObjectId(user_id)
@@ -66,12 +70,10 @@ class CRUDNotification:
         
         notification_data["created_at"] = datetime.utcnow()
         
-        # Insert into database
-        result = await self.collection.insert_one(notification_data)
+        # Insert into database; insert_one sets _id on notification_data
+        await self.collection.insert_one(notification_data)
         
-        # Return the created notification
-        created_notification = await self.get(str(result.inserted_id))
-        return created_notification
+        return NotificationInDB(**notification_data)
 
     async def update(
         self, notification_id: str, notification_in: NotificationUpdate
@@ -79,22 +81,19 @@ class CRUDNotification:
         if not ObjectId.is_valid(notification_id):
             return None
             
-        # Get existing notification
-        existing_notification = await self.get(notification_id)
-        if not existing_notification:
-            return None
-            
         # Prepare update data
         update_data = notification_in.dict(exclude_unset=True)
+        if not update_data:
+            return await self.get(notification_id)
         
-        # Perform the update
-        result = await self.collection.update_one(
+        # Update and read back in one round trip; None if it doesn't exist
+        notification_data = await self.collection.find_one_and_update(
             {"_id": ObjectId(notification_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 1:
-            return await self.get(notification_id)
+        if notification_data:
+            return from_db(NotificationInDB, notification_data)
         return None
 
     async def mark_as_read(self, notification_id: str) -> bool:
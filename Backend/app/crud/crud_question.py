@@ -1,9 +1,38 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Union
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 from fastapi import HTTPException, status
-from app.models.question import QuestionInDB, QuestionCreate, QuestionUpdate, Question
+from app.models.question import QuestionInDB, QuestionCreate, QuestionUpdate, Question, QuestionSummary
+from app.core.config import settings
+from app.core.exceptions import BadRequestException
+from app.core.utils import make_excerpt
 from app.db.session import get_collection
+from app.crud.counts import count_cache
+from app.crud.pagination import apply_cursor, paged_query, sort_spec
+from app.crud.readers import from_db, many_from_db
+from app.services.inverted_index import question_index
+
+# Stored fields a QuestionSummary always reads; the rest are opt-in
+SUMMARY_FIELDS = (
+    "title", "excerpt", "tags", "is_answered", "views", "votes", "answer_count",
+    "status", "author_id", "author_name", "created_at", "updated_at"
+)
+OPTIONAL_SUMMARY_FIELDS = ("content", "accepted_answer_id")
+
+def summary_projection(fields: Iterable[str] = ()) -> Dict[str, int]:
+    """Mongo projection for question summaries plus the requested extra ``fields``"""
+    fields = [field.strip() for field in fields]
+    fields = [field for field in fields if field and field not in SUMMARY_FIELDS and field != "id"]
+    unknown = [field for field in fields if field not in OPTIONAL_SUMMARY_FIELDS]
+    if unknown:
+        raise BadRequestException(
+            f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(OPTIONAL_SUMMARY_FIELDS)}"
+        )
+    return {field: 1 for field in (*SUMMARY_FIELDS, *fields)}
+
+def _many_from_db(documents: List[Dict[str, Any]], projection: Optional[Dict[str, int]]):
+    return many_from_db(QuestionSummary if projection else QuestionInDB, documents)
 
 class CRUDQuestion:
     def __init__(self):
@@ -20,7 +49,7 @@ class CRUDQuestion:
             return None
         question_data = await self.collection.find_one({"_id": ObjectId(question_id)})
         if question_data:
-            return QuestionInDB(**question_data)
+            return from_db(QuestionInDB, question_data)
         return None
 
     async def get_multi(
@@ -28,7 +57,8 @@ class CRUDQuestion:
         skip: int = 0, 
         limit: int = 100,
         tag: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[QuestionInDB]:
         filter_query = {}
         
@@ -41,27 +71,64 @@ class CRUDQuestion:
                 {"content": {"$regex": search, "$options": "i"}}
             ]
         
-        questions = []
-        cursor = self.collection.find(filter_query).sort("created_at", -1).skip(skip).limit(limit)
+        # A cursor seeks past the previous page; skip is only a legacy fallback
+        filter_query = apply_cursor(filter_query, cursor, "created_at")
         
-        async for question_data in cursor:
-            questions.append(QuestionInDB(**question_data))
+        db_cursor = self.collection.find(filter_query).sort(sort_spec("created_at")).skip(0 if cursor else skip).limit(limit)
+        return many_from_db(QuestionInDB, await db_cursor.to_list(length=limit))
+
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        tag: Optional[str] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        include_total: bool = True,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Union[QuestionInDB, QuestionSummary]], Optional[int]]:
+        """
+        A page of questions plus the total matching the same filters. The
+        unfiltered, tag and status totals come from the count cache, so those
+        pages are usually one round trip; searches are counted with a
+        separate ``count_documents``. With a ``summary_projection``, items are
+        QuestionSummary instead of full questions.
+        """
+        filter_query: Dict[str, Any] = {}
+        if tag:
+            filter_query["tags"] = tag
+        if status:
+            filter_query["status"] = status
+        if search:
+            filter_query["$or"] = [
+                {"title": {"$regex": search, "$options": "i"}},
+                {"content": {"$regex": search, "$options": "i"}}
+            ]
         
-        return questions
+        page = await paged_query(
+            self.collection, filter_query, "created_at", skip=skip, limit=limit, cursor=cursor,
+            include_total=include_total, cache_total=True, projection=projection
+        )
+        return _many_from_db(page.items, projection), page.total
 
     async def create(self, question_in: QuestionCreate, author_id: str, author_name: str) -> QuestionInDB:
         # Create question data
         question_data = question_in.dict()
         question_data["author_id"] = ObjectId(author_id)
         question_data["author_name"] = author_name
+        question_data["excerpt"] = make_excerpt(question_in.content, settings.QUESTION_EXCERPT_LENGTH)
         question_data["created_at"] = datetime.utcnow()
         question_data["updated_at"] = datetime.utcnow()
         
-        # Insert into database
-        result = await self.collection.insert_one(question_data)
+        # Insert into database; insert_one sets _id on question_data, so the
+        # created question is built from it without reading it back
+        await self.collection.insert_one(question_data)
+        count_cache.adjust("questions", question_data, 1)
         
-        # Return the created question
-        created_question = await self.get(str(result.inserted_id))
+        created_question = QuestionInDB(**question_data)
+        if question_index.enabled:
+            question_index.add(created_question.id, created_question.title, created_question.content)
         return created_question
 
     async def update(
@@ -70,41 +137,40 @@ class CRUDQuestion:
         if not ObjectId.is_valid(question_id):
             return None
             
-        # Get existing question
-        existing_question = await self.get(question_id)
-        if not existing_question:
-            return None
-            
         # Prepare update data
         update_data = question_in.dict(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow()
+        if update_data.get("content"):
+            update_data["excerpt"] = make_excerpt(update_data["content"], settings.QUESTION_EXCERPT_LENGTH)
         
-        # Perform the update
-        result = await self.collection.update_one(
+        # Update and read back in one round trip; None if it doesn't exist
+        question_data = await self.collection.find_one_and_update(
             {"_id": ObjectId(question_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
+        if not question_data:
+            return None
+        if "tags" in update_data or "status" in update_data:
+            count_cache.invalidate("questions")
         
-        if result.modified_count == 1:
-            return await self.get(question_id)
-        return None
+        updated_question = from_db(QuestionInDB, question_data)
+        if question_index.enabled:
+            question_index.add(updated_question.id, updated_question.title, updated_question.content)
+        return updated_question
 
     async def delete(self, question_id: str) -> bool:
         if not ObjectId.is_valid(question_id):
             return False
             
-        result = await self.collection.delete_one({"_id": ObjectId(question_id)})
-        return result.deleted_count > 0
-
-    async def increment_views(self, question_id: str) -> bool:
-        if not ObjectId.is_valid(question_id):
+        # find_one_and_delete returns the document, so cached totals it counted in can drop it
+        question_data = await self.collection.find_one_and_delete({"_id": ObjectId(question_id)})
+        if not question_data:
             return False
-            
-        result = await self.collection.update_one(
-            {"_id": ObjectId(question_id)},
-            {"$inc": {"views": 1}}
-        )
-        return result.modified_count == 1
+        count_cache.adjust("questions", question_data, -1)
+        if question_index.enabled:
+            question_index.remove(ObjectId(question_id))
+        return True
 
     async def update_answer_count(self, question_id: str, increment: bool = True) -> bool:
         if not ObjectId.is_valid(question_id):
@@ -133,17 +199,65 @@ class CRUDQuestion:
         )
         return result.modified_count == 1
 
-    async def get_by_tag(self, tag: str, skip: int = 0, limit: int = 100) -> List[QuestionInDB]:
-        questions = []
-        cursor = self.collection.find({"tags": tag}).sort("created_at", -1).skip(skip).limit(limit)
-        
-        async for question_data in cursor:
-            questions.append(QuestionInDB(**question_data))
+    async def get_by_tag(
+        self, tag: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[QuestionInDB]:
+        filter_query = apply_cursor({"tags": tag}, cursor, "created_at")
         
+        db_cursor = self.collection.find(filter_query).sort(sort_spec("created_at")).skip(0 if cursor else skip).limit(limit)
+        return many_from_db(QuestionInDB, await db_cursor.to_list(length=limit))
+
+    async def search(
+        self, query: str, skip: int = 0, limit: int = 100, projection: Optional[Dict[str, int]] = None
+    ) -> List[Union[QuestionInDB, QuestionSummary]]:
+        questions, _ = await self.text_search(query, skip=skip, limit=limit, projection=projection)
         return questions
 
-    async def search(self, query: str, skip: int = 0, limit: int = 100) -> List[QuestionInDB]:
-        questions = []
+    async def text_search(
+        self, query: str, skip: int = 0, limit: int = 100, projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Union[QuestionInDB, QuestionSummary]], int]:
+        """
+        Rank questions by textScore on the weighted title/content text index,
+        returning the page and the total match count from one aggregation
+        """
+        items_stages = [{"$skip": skip}, {"$limit": limit}]
+        if projection:
+            items_stages.append({"$project": projection})
+        pipeline = [
+            {"$match": {"$text": {"$search": query}}},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+            {"$sort": {"score": -1, "_id": -1}},
+            {
+                "$facet": {
+                    "items": items_stages,
+                    "total": [{"$count": "count"}]
+                }
+            }
+        ]
+        
+        result = await self.collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+        if not result:
+            return [], 0
+        
+        questions = _many_from_db(result[0]["items"], projection)
+        total = result[0]["total"][0]["count"] if result[0]["total"] else 0
+        return questions, total
+
+    async def get_many(
+        self, question_ids: List[ObjectId], projection: Optional[Dict[str, int]] = None
+    ) -> List[Union[QuestionInDB, QuestionSummary]]:
+        """Fetch questions by id, preserving the order of ``question_ids``"""
+        if not question_ids:
+            return []
+        
+        documents = await self.collection.find({"_id": {"$in": question_ids}}, projection).to_list(length=None)
+        found = {question.id: question for question in _many_from_db(documents, projection)}
+        return [found[question_id] for question_id in question_ids if question_id in found]
+
+    async def regex_search(
+        self, query: str, skip: int = 0, limit: int = 100, projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Union[QuestionInDB, QuestionSummary]], int]:
+        """Legacy unindexed substring search over title and content"""
         search_filter = {
             "$or": [
                 {"title": {"$regex": query, "$options": "i"}},
@@ -151,29 +265,44 @@ class CRUDQuestion:
             ]
         }
         
-        cursor = self.collection.find(search_filter).sort("created_at", -1).skip(skip).limit(limit)
+        cursor = self.collection.find(search_filter, projection).sort("created_at", -1).skip(skip).limit(limit)
         
-        async for question_data in cursor:
-            questions.append(QuestionInDB(**question_data))
+        questions = _many_from_db(await cursor.to_list(length=limit), projection)
         
-        return questions
+        total = await self.collection.count_documents(search_filter)
+        return questions, total
+
+    async def backfill_excerpts(self, batch_size: int = 500) -> int:
+        """Store excerpts on questions written before summaries existed; returns how many"""
+        updated = 0
+        operations = []
+        async for question_data in self.collection.find({"excerpt": {"$exists": False}}, {"content": 1}):
+            excerpt = make_excerpt(question_data.get("content", ""), settings.QUESTION_EXCERPT_LENGTH)
+            operations.append(UpdateOne({"_id": question_data["_id"]}, {"$set": {"excerpt": excerpt}}))
+            if len(operations) >= batch_size:
+                await self.collection.bulk_write(operations, ordered=False)
+                updated += len(operations)
+                operations = []
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+        return updated
 
     async def get_by_status(self, status: str, skip: int = 0, limit: int = 100) -> List[QuestionInDB]:
-        questions = []
         cursor = self.collection.find({"status": status}).sort("created_at", -1).skip(skip).limit(limit)
-        async for question_data in cursor:
-            questions.append(QuestionInDB(**question_data))
-        return questions
+        return many_from_db(QuestionInDB, await cursor.to_list(length=limit))
 
     async def update_status(self, question_id: str, status: str) -> Optional[QuestionInDB]:
         if not ObjectId.is_valid(question_id):
             return None
-        result = await self.collection.update_one(
+        question_data = await self.collection.find_one_and_update(
             {"_id": ObjectId(question_id)},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
         )
-        if result.modified_count == 1:
-            return await self.get(question_id)
+        count_cache.invalidate("questions")
+        if question_data:
+            return from_db(QuestionInDB, question_data)
         return None
 
 # Create a default instance for easy importing
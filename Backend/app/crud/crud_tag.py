@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from fastapi import HTTPException, status
 from app.models.tag import TagInDB, TagCreate, Tag
 from app.db.session import get_collection
@@ -31,21 +32,19 @@ class CRUDTag:
         return tags
 
     async def create(self, tag_in: TagCreate) -> TagInDB:
-        # Check if tag already exists
-        existing_tag = await self.get(tag_in.name)
-        if existing_tag:
-            return existing_tag
-        
         # Create tag data
         tag_data = tag_in.dict()
         tag_data["created_at"] = datetime.utcnow()
         
-        # Insert into database
-        result = await self.collection.insert_one(tag_data)
-        
-        # Return the created tag
-        created_tag = await self.get(tag_in.name)
-        return created_tag
+        # Insert unless a tag with this name exists, returning whichever is
+        # stored, in one round trip
+        stored_tag = await self.collection.find_one_and_update(
+            {"name": tag_in.name},
+            {"$setOnInsert": tag_data},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return TagInDB(**stored_tag)
 
     async def increment_question_count(self, tag_name: str) -> bool:
         result = await self.collection.update_one(
@@ -0,0 +1,179 @@
+from typing import Optional, List, Dict, Any, Iterable, Set, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.models.upload import UploadInDB, UploadCreate
+from app.db.session import get_collection
+from app.crud.pagination import apply_cursor, sort_spec
+from app.crud.readers import from_db, many_from_db
+
+class CRUDUpload:
+    """
+    Metadata for every blob in the uploads container.
+
+    Uploads and deletes write through to this collection, so listings,
+    lookups and quota checks never need a request to blob storage. The
+    reconciliation job in app/services/upload_reconciler.py repairs drift.
+    """
+
+    def __init__(self):
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection("uploads")
+        return self._collection
+
+    async def get_by_file_id(self, file_id: str, user_id: Optional[str] = None) -> Optional[UploadInDB]:
+        """
+        Record for ``file_id``. Deduplicated content is shared by several
+        records; ``user_id`` picks that user's own record, if they have one.
+        """
+        upload_data = None
+        if user_id and ObjectId.is_valid(user_id):
+            upload_data = await self.collection.find_one({"file_id": file_id, "uploaded_by": ObjectId(user_id)})
+        if upload_data is None:
+            upload_data = await self.collection.find_one({"file_id": file_id})
+        if upload_data:
+            return from_db(UploadInDB, upload_data)
+        return None
+
+    async def get_owned(self, file_id: str, user_id: str) -> Optional[UploadInDB]:
+        """``user_id``'s own record for ``file_id``; never another uploader's"""
+        if not ObjectId.is_valid(user_id):
+            return None
+        upload_data = await self.collection.find_one({"file_id": file_id, "uploaded_by": ObjectId(user_id)})
+        if upload_data:
+            return from_db(UploadInDB, upload_data)
+        return None
+
+    async def get_by_derivative(self, name: str, file_id: str, user_id: Optional[str] = None) -> Optional[UploadInDB]:
+        """A record whose ``name`` derivative is stored as ``file_id``; ``user_id``'s own, if given"""
+        query: Dict[str, Any] = {f"derivatives.{name}.file_id": file_id}
+        if user_id is not None:
+            if not ObjectId.is_valid(user_id):
+                return None
+            query["uploaded_by"] = ObjectId(user_id)
+        upload_data = await self.collection.find_one(query)
+        if upload_data:
+            return from_db(UploadInDB, upload_data)
+        return None
+
+    async def get_by_digest(self, user_id: str, digest: str) -> Optional[UploadInDB]:
+        if not ObjectId.is_valid(user_id):
+            return None
+        upload_data = await self.collection.find_one({"uploaded_by": ObjectId(user_id), "sha256": digest})
+        if upload_data:
+            return from_db(UploadInDB, upload_data)
+        return None
+
+    async def get_multi(
+        self,
+        folder: Optional[str] = None,
+        uploaded_by: Optional[str] = None,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> List[UploadInDB]:
+        filter_query: Dict[str, Any] = {"file_id": {"$exists": True}}
+        if folder:
+            filter_query["folder"] = folder
+        if uploaded_by and ObjectId.is_valid(uploaded_by):
+            filter_query["uploaded_by"] = ObjectId(uploaded_by)
+
+        filter_query = apply_cursor(filter_query, cursor, "created_at")
+
+        db_cursor = self.collection.find(filter_query).sort(sort_spec("created_at")).limit(limit)
+        return many_from_db(UploadInDB, await db_cursor.to_list(length=limit))
+
+    async def create(self, upload_in: UploadCreate, user_id: Optional[str] = None) -> UploadInDB:
+        upload, _ = await self.upsert(upload_in, user_id)
+        return upload
+
+    async def upsert(self, upload_in: UploadCreate, user_id: Optional[str] = None) -> Tuple[UploadInDB, bool]:
+        """
+        Write the record for (file_id, uploader) and say whether it is new.
+
+        Upserting makes a retried write-through harmless. ``False`` means the
+        record already existed, e.g. the same user uploaded the same bytes
+        twice at once; it holds its own reference to the file.
+        """
+        upload_data = upload_in.dict()
+        if user_id and ObjectId.is_valid(user_id):
+            upload_data["uploaded_by"] = ObjectId(user_id)
+        key = {"file_id": upload_in.file_id, "uploaded_by": upload_data.get("uploaded_by")}
+
+        # The previous version tells an insert from an update in one round trip
+        upload_id = ObjectId()
+        previous = await self.collection.find_one_and_update(
+            key,
+            {"$set": upload_data, "$setOnInsert": {"_id": upload_id}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            return from_db(UploadInDB, {"_id": upload_id, **key, **upload_data}), True
+        return from_db(UploadInDB, {**previous, **upload_data}), False
+
+    async def adopt(self, upload_in: UploadCreate, user_id: str) -> bool:
+        """Insert a record for (file_id, uploader) only if there is none; True if inserted"""
+        upload_data = upload_in.dict()
+        if ObjectId.is_valid(user_id):
+            upload_data["uploaded_by"] = ObjectId(user_id)
+        result = await self.collection.update_one(
+            {"file_id": upload_in.file_id, "uploaded_by": upload_data.get("uploaded_by")},
+            {"$setOnInsert": upload_data},
+            upsert=True
+        )
+        return result.upserted_id is not None
+
+    async def update(self, file_id: str, update_data: Dict[str, Any]) -> bool:
+        result = await self.collection.update_many({"file_id": file_id}, {"$set": update_data})
+        return result.modified_count > 0
+
+    async def delete(self, file_id: str) -> bool:
+        """Delete every record for a stored file"""
+        result = await self.collection.delete_many({"file_id": file_id})
+        return result.deleted_count > 0
+
+    async def delete_record(self, upload_id: ObjectId) -> bool:
+        result = await self.collection.delete_one({"_id": upload_id})
+        return result.deleted_count > 0
+
+    async def count_references(self, file_id: str) -> int:
+        return await self.collection.count_documents({"file_id": file_id})
+
+    async def referenced_file_ids(self, file_ids: Iterable[str]) -> Set[str]:
+        """The subset of ``file_ids`` that some upload record references, in one query"""
+        ids = list(set(file_ids))
+        if not ids:
+            return set()
+        return set(await self.collection.distinct("file_id", {"file_id": {"$in": ids}}))
+
+    async def get_usage(self, user_id: str) -> Dict[str, int]:
+        """Total bytes and file count stored by a user"""
+        if not ObjectId.is_valid(user_id):
+            return {"bytes": 0, "files": 0}
+
+        pipeline = [
+            {"$match": {"uploaded_by": ObjectId(user_id), "file_id": {"$exists": True}}},
+            {"$group": {"_id": None, "bytes": {"$sum": "$size"}, "files": {"$sum": 1}}}
+        ]
+        async for usage in self.collection.aggregate(pipeline):
+            return {"bytes": usage["bytes"], "files": usage["files"]}
+        return {"bytes": 0, "files": 0}
+
+    def iter_owned(self, batch_size: int = 1000):
+        """Every upload record that names its uploader, in _id order"""
+        return self.collection.find(
+            {"file_id": {"$exists": True}, "uploaded_by": {"$ne": None}}
+        ).sort("_id", 1).batch_size(batch_size)
+
+    def iter_sorted(self, batch_size: int = 1000):
+        """Every upload record ordered by file_id, as the container lists blobs"""
+        return self.collection.find(
+            {"file_id": {"$exists": True}},
+            {"file_id": 1, "size": 1, "content_type": 1, "created_at": 1}
+        ).sort("file_id", 1).batch_size(batch_size)
+
+# Create a default instance for easy importing
+upload = CRUDUpload()
@@ -1,9 +1,20 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Set
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from fastapi import HTTPException, status
 from app.models.user import UserInDB, UserCreate, UserUpdate, User
 from app.db.session import get_collection
+from app.crud.pagination import apply_cursor, sort_spec
+from app.crud.readers import from_db, many_from_db
+from app.core.config import settings
+from app.core.cache import TTLCache
+
+# Authenticated principals by user id, so get_current_user can skip the
+# database. Writes that change role, status or token version invalidate
+# the entry; the TTL bounds staleness for writes made by other workers.
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
 
 class CRUDUser:
     def __init__(self):
@@ -18,10 +29,7 @@ class CRUDUser:
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
         user_data = await self.collection.find_one({"email": email})
         if user_data:
-            # Convert ObjectId to string for JSON serialization
-            if "_id" in user_data:
-                user_data["_id"] = str(user_data["_id"])
-            return UserInDB(**user_data)
+            return from_db(UserInDB, user_data)
         return None
 
     async def get(self, user_id: str) -> Optional[UserInDB]:
@@ -29,22 +37,29 @@ class CRUDUser:
             return None
         user_data = await self.collection.find_one({"_id": ObjectId(user_id)})
         if user_data:
-            # Convert ObjectId to string for JSON serialization
-            if "_id" in user_data:
-                user_data["_id"] = str(user_data["_id"])
-            return UserInDB(**user_data)
+            return from_db(UserInDB, user_data)
         return None
 
-    async def get_multi(self, skip: int = 0, limit: int = 100) -> list[UserInDB]:
-        """Get multiple users with pagination"""
-        cursor = self.collection.find().skip(skip).limit(limit)
-        users = []
-        async for user_data in cursor:
-            # Convert ObjectId to string for JSON serialization
-            if "_id" in user_data:
-                user_data["_id"] = str(user_data["_id"])
-            users.append(UserInDB(**user_data))
-        return users
+    async def get_principal(self, user_id: str) -> Optional[UserInDB]:
+        """Get a user for authentication, served from the principal cache when fresh"""
+        user = principal_cache.get(user_id)
+        if user is not None:
+            return user
+        
+        generation = principal_cache.generation
+        user = await self.get(user_id)
+        # Don't cache a read that an invalidation raced past
+        if user is not None and principal_cache.generation == generation:
+            principal_cache.set(user_id, user)
+        return user
+
+    async def get_multi(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> list[UserInDB]:
+        """Get multiple users with pagination (keyset on _id when a cursor is given)"""
+        filter_query = apply_cursor({}, cursor, "_id", direction=1)
+        db_cursor = self.collection.find(filter_query).sort(sort_spec("_id", 1)).skip(0 if cursor else skip).limit(limit)
+        return many_from_db(UserInDB, await db_cursor.to_list(length=limit))
 
     async def create(self, user_in: UserCreate) -> UserInDB:
         # Check if user with email already exists
@@ -56,8 +71,8 @@ class CRUDUser:
             )
         
         # Hash the password
-        from app.core.security import get_password_hash
-        hashed_password = get_password_hash(user_in.password)
+        from app.core.security import get_password_hash_async
+        hashed_password = await get_password_hash_async(user_in.password)
         
         # Create user data
         user_data = user_in.dict(exclude={"password"}, exclude_unset=True)
@@ -65,12 +80,17 @@ class CRUDUser:
         user_data["created_at"] = datetime.utcnow()
         user_data["updated_at"] = datetime.utcnow()
         
-        # Insert into database
-        result = await self.collection.insert_one(user_data)
+        # Insert into database; insert_one sets _id on user_data. The unique
+        # email index catches a concurrent signup the check above missed
+        try:
+            await self.collection.insert_one(user_data)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The user with this email already exists."
+            )
         
-        # Return the created user
-        created_user = await self.get(str(result.inserted_id))
-        return created_user
+        return from_db(UserInDB, user_data)
 
     async def update(
         self, user_id: str, user_in: UserUpdate
@@ -78,40 +98,37 @@ class CRUDUser:
         if not ObjectId.is_valid(user_id):
             return None
             
-        # Get existing user
-        existing_user = await self.get(user_id)
-        if not existing_user:
-            return None
-            
         # Prepare update data
         update_data = user_in.dict(exclude_unset=True)
         
         # If password is being updated, hash it
         if "password" in update_data:
-            from app.core.security import get_password_hash
-            hashed_password = get_password_hash(update_data["password"])
+            from app.core.security import get_password_hash_async
+            hashed_password = await get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
         
         # Update the user
         update_data["updated_at"] = datetime.utcnow()
         
-        # Perform the update
-        result = await self.collection.update_one(
+        # Update and read back in one round trip; None if it doesn't exist
+        user_data = await self.collection.find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
+        principal_cache.invalidate(user_id)
         
-        if result.modified_count == 1:
-            return await self.get(user_id)
+        if user_data:
+            return from_db(UserInDB, user_data)
         return None
 
     async def authenticate(self, email: str, password: str) -> Optional[UserInDB]:
         user = await self.get_by_email(email)
         if not user:
             return None
-        from app.core.security import verify_password
-        if not verify_password(password, user.hashed_password):
+        from app.core.security import verify_password_async
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -120,8 +137,21 @@ class CRUDUser:
             return False
             
         result = await self.collection.delete_one({"_id": ObjectId(user_id)})
+        principal_cache.invalidate(user_id)
         return result.deleted_count > 0
 
+    async def exists(self, user_id: str) -> bool:
+        if not ObjectId.is_valid(user_id):
+            return False
+        return await self.collection.count_documents({"_id": ObjectId(user_id)}, limit=1) > 0
+
+    async def existing_ids(self, user_ids: Iterable[ObjectId]) -> Set[ObjectId]:
+        """The subset of ``user_ids`` that still belong to a user, in one query"""
+        ids = list(set(user_ids))
+        if not ids:
+            return set()
+        return {user["_id"] async for user in self.collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+
     async def update_last_login(self, user_id: str) -> bool:
         """Update the last login timestamp for a user"""
         if not ObjectId.is_valid(user_id):
@@ -143,6 +173,7 @@ class CRUDUser:
             {"$inc": {"token_version": 1}},
             return_document=True
         )
+        principal_cache.invalidate(user_id)
         return result.get("token_version", 1) if result else -1
 
     async def get_user_permissions(self, user_id: str) -> list[str]:
@@ -165,6 +196,7 @@ class CRUDUser:
             {"_id": ObjectId(user_id)},
             {"$set": {"role": role, "updated_at": datetime.utcnow()}}
         )
+        principal_cache.invalidate(user_id)
         return result.modified_count > 0
 
 # Create a default instance for easy importing
@@ -0,0 +1,166 @@
+import base64
+import binascii
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from bson import json_util
+from bson.errors import InvalidId
+from app.core.exceptions import BadRequestException
+from app.crud.counts import count_cache
+
+# Keyset (cursor) pagination helpers.
+#
+# A cursor is an opaque, URL-safe token holding the sort key and ``_id`` of the
+# last item on the previous page. Lists sort on ``(sort_field, _id)`` so the
+# next page can seek straight past that item instead of skipping ``N`` rows.
+
+def encode_cursor(sort_value: Any, object_id: Any) -> str:
+    """Build an opaque cursor pointing just after ``(sort_value, object_id)``"""
+    raw = json_util.dumps([sort_value, object_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor``"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, object_id = json_util.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError, InvalidId, UnicodeDecodeError):
+        raise BadRequestException("Invalid pagination cursor")
+    return [sort_value, object_id]
+
+def sort_spec(sort_field: str, direction: int = -1) -> List[tuple]:
+    """Sort order for a keyset list, with ``_id`` as the tiebreaker"""
+    if sort_field == "_id":
+        return [("_id", direction)]
+    return [(sort_field, direction), ("_id", direction)]
+
+def apply_cursor(
+    filter_query: Dict[str, Any],
+    cursor: Optional[str],
+    sort_field: str,
+    direction: int = -1
+) -> Dict[str, Any]:
+    """Combine ``filter_query`` with the seek condition encoded in ``cursor``"""
+    if not cursor:
+        return filter_query
+
+    sort_value, object_id = decode_cursor(cursor)
+    op = "$lt" if direction < 0 else "$gt"
+
+    if sort_field == "_id":
+        seek = {"_id": {op: object_id}}
+    else:
+        seek = {
+            "$or": [
+                {sort_field: {op: sort_value}},
+                {sort_field: sort_value, "_id": {op: object_id}}
+            ]
+        }
+
+    if not filter_query:
+        return seek
+    return {"$and": [filter_query, seek]}
+
+def next_cursor(items: Sequence[Any], sort_field: str, limit: int) -> Optional[str]:
+    """Cursor for the page after ``items``, or None when this is the last page"""
+    if not items or len(items) < limit:
+        return None
+
+    last = items[-1]
+    if isinstance(last, dict):
+        object_id = last.get("_id", last.get("id"))
+        sort_value = object_id if sort_field == "_id" else last.get(sort_field)
+    else:
+        object_id = last.id
+        sort_value = object_id if sort_field == "_id" else getattr(last, sort_field)
+    return encode_cursor(sort_value, object_id)
+
+# Name of the total among the counts passed to _count
+TOTAL = "_total"
+
+class Page(NamedTuple):
+    """One page of raw documents, the filter's total (None if not asked for) and any side counts"""
+    items: List[Dict[str, Any]]
+    total: Optional[int]
+    counts: Dict[str, int]
+
+async def _count(collection, filter_query: Dict[str, Any], conditions: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Documents matching ``filter_query`` plus each named condition"""
+    if len(conditions) == 1:
+        name, condition = next(iter(conditions.items()))
+        query = {"$and": [filter_query, condition]} if condition and filter_query else (condition or filter_query)
+        return {name: await collection.count_documents(query)}
+
+    # Several numbers share one pass. Only the fields the conditions test
+    # are carried into the $facet, so no full documents flow through it
+    fields = {field: 1 for condition in conditions.values() for field in condition}
+    pipeline = [
+        {"$match": filter_query},
+        {"$project": {"_id": 0, **fields} if fields else {"_id": 1}},
+        {"$facet": {
+            name: ([{"$match": condition}] if condition else []) + [{"$count": "count"}]
+            for name, condition in conditions.items()
+        }}
+    ]
+    result = await collection.aggregate(pipeline).to_list(length=1)
+    facet = result[0] if result else {}
+    return {name: (facet.get(name) or [{"count": 0}])[0]["count"] for name in conditions}
+
+async def paged_query(
+    collection,
+    filter_query: Dict[str, Any],
+    sort_field: str,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    direction: int = -1,
+    counts: Optional[Dict[str, Dict[str, Any]]] = None,
+    include_total: bool = True,
+    cache_total: bool = False,
+    projection: Optional[Dict[str, Any]] = None
+) -> Page:
+    """
+    Fetch a page, the total matching ``filter_query`` and named side counts.
+
+    The page is a plain limited ``find`` with the cursor seek in its filter,
+    so on the list indexes (app/db/indexes.py) it examines about ``limit``
+    documents however deep the page is. ``skip`` is ignored with a cursor.
+    ``projection`` trims the returned items.
+
+    Counting is separate and only happens when asked for. ``counts`` maps
+    names to extra conditions on the filter, e.g.
+    ``{"unread": {"is_read": False}}``; the cursor never narrows them.
+    ``include_total=False`` skips the total. With ``cache_total``, the total
+    of an unfiltered or plain equality filter comes from ``count_cache``
+    (estimated or a maintained counter). Whatever is left is one
+    ``count_documents``, or one ``$facet`` of ``$count``s when there are
+    several numbers.
+
+    This is deliberately not one ``$facet`` for page and counts together.
+    That saves a round trip, but every matching document flows into the
+    facet and the cursor seek can no longer use the index, so deep pages
+    and large filters get slower instead. An uncached total therefore costs
+    a second round trip; cached or skipped totals cost none, and extra
+    counts share the second one.
+    """
+    db_cursor = (
+        collection.find(apply_cursor(filter_query, cursor, sort_field, direction), projection)
+        .sort(sort_spec(sort_field, direction))
+        .skip(0 if cursor else skip)
+        .limit(limit)
+    )
+    items = await db_cursor.to_list(length=limit)
+
+    total = None
+    if include_total and cache_total and count_cache.cacheable(filter_query):
+        total = await count_cache.count(collection, filter_query)
+
+    conditions: Dict[str, Dict[str, Any]] = {}
+    if include_total and total is None:
+        conditions[TOTAL] = {}
+    conditions.update(counts or {})
+    values = await _count(collection, filter_query, conditions) if conditions else {}
+
+    return Page(
+        items=items,
+        total=values.pop(TOTAL, total),
+        counts=values
+    )
@@ -0,0 +1,32 @@
+from typing import Any, Dict, Iterable, List, Type, TypeVar
+from pydantic import BaseModel, TypeAdapter
+
+# Read models from stored documents.
+#
+# A page is validated in one TypeAdapter call instead of one ``Model(**doc)``
+# per row: the loop over rows and fields runs inside pydantic-core, and the
+# documents are passed as they are (no kwargs copy, no hand-stringified ids
+# for PyObjectId fields to parse back). Validation itself is kept, so a bad
+# stored row still fails loudly. ``model_construct`` was measured as well and
+# is slower than batched validation on pydantic 2.4; see
+# scripts/benchmark_model_reads.py.
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+_list_adapters: Dict[type, TypeAdapter] = {}
+
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    adapter = _list_adapters.get(model)
+    if adapter is None:
+        adapter = _list_adapters[model] = TypeAdapter(List[model])
+    return adapter
+
+def from_db(model: Type[ModelType], document: Dict[str, Any]) -> ModelType:
+    """Build ``model`` from one stored document"""
+    return model.model_validate(document)
+
+def many_from_db(model: Type[ModelType], documents: Iterable[Dict[str, Any]]) -> List[ModelType]:
+    """Build ``model`` for a page of stored documents in a single validation call"""
+    if not isinstance(documents, list):
+        documents = list(documents)
+    return _list_adapter(model).validate_python(documents)
@@ -0,0 +1,175 @@
+import logging
+from typing import Any, Dict, List
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Declarative index specification, one entry per collection.
+#
+# Index names are left to pymongo so they match what ``create_index`` has
+# always generated (e.g. ``email_1``) and existing deployments diff cleanly.
+# List indexes end in ``_id`` because the CRUD layer pages on
+# ``(sort_field, _id)``. ``background`` keeps builds non-blocking on servers
+# older than 4.2; newer servers always use the optimized build and ignore it.
+INDEX_SPECS: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, background=True),
+        IndexModel([("role", ASCENDING)], background=True),
+        IndexModel([("is_active", ASCENDING)], background=True),
+        IndexModel([("created_at", ASCENDING)], background=True),
+        IndexModel(
+            [("email", TEXT), ("first_name", TEXT), ("last_name", TEXT)],
+            background=True
+        ),
+    ],
+    "questions": [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], background=True),
+        IndexModel(
+            [("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            background=True
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            background=True
+        ),
+        # Backs /search/; title matches outrank content matches
+        IndexModel(
+            [("title", TEXT), ("content", TEXT)],
+            weights={"title": 10, "content": 2},
+            background=True
+        ),
+    ],
+    "answers": [
+        IndexModel(
+            [("question_id", ASCENDING), ("votes", DESCENDING), ("_id", DESCENDING)],
+            background=True
+        ),
+        IndexModel([("author_id", ASCENDING), ("created_at", DESCENDING)], background=True),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], background=True),
+    ],
+    "notifications": [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            background=True
+        ),
+        IndexModel([("user_id", ASCENDING), ("is_read", ASCENDING)], background=True),
+    ],
+    "revoked_tokens": [
+        # TTL: Mongo drops each entry once the token itself has expired
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, background=True),
+        IndexModel([("revoked_at", ASCENDING)], background=True),
+    ],
+    "uploads": [
+        # One record per uploader of a stored file (deduplicated content is shared).
+        # Partial: seeded records that predate write-through have no file_id
+        IndexModel(
+            [("file_id", ASCENDING), ("uploaded_by", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"file_id": {"$exists": True}},
+            background=True
+        ),
+        IndexModel([("uploaded_by", ASCENDING), ("sha256", ASCENDING)], background=True),
+        # Derivative downloads find their original by the derivative's file_id;
+        # one per name in app/services/image_derivatives.DERIVATIVE_NAMES
+        IndexModel([("derivatives.thumbnail.file_id", ASCENDING)], sparse=True, background=True),
+        IndexModel([("derivatives.display.file_id", ASCENDING)], sparse=True, background=True),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], background=True),
+        IndexModel(
+            [("uploaded_by", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            background=True
+        ),
+        IndexModel(
+            [("folder", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            background=True
+        ),
+    ],
+    "file_objects": [
+        IndexModel([("file_id", ASCENDING)], background=True),
+    ],
+    "tags": [
+        IndexModel([("name", ASCENDING)], unique=True, background=True),
+        IndexModel([("question_count", DESCENDING)], background=True),
+    ],
+}
+
+def _key_signature(key: Any) -> tuple:
+    """Comparable form of an index key; text indexes are compared by weights instead"""
+    pairs = list(key.items()) if isinstance(key, dict) else list(key)
+    if any(value == TEXT for _, value in pairs) or ("_fts", TEXT) in pairs:
+        return ("text",)
+    return tuple((field, value if isinstance(value, str) else int(value)) for field, value in pairs)
+
+def _spec_signature(index: IndexModel) -> tuple:
+    document = index.document
+    signature = _key_signature(document["key"])
+    if signature == ("text",):
+        weights = document.get("weights", {})
+        fields = {field: weights.get(field, 1) for field, value in document["key"].items() if value == TEXT}
+        return signature + tuple(sorted(fields.items()))
+    return signature
+
+def _live_signature(info: Dict[str, Any]) -> tuple:
+    signature = _key_signature(info["key"])
+    if signature == ("text",):
+        # The server reports text fields via ``weights``; the key is just _fts/_ftsx
+        weights = info.get("weights") or {field: 1 for field, value in info["key"] if value == TEXT}
+        return signature + tuple(sorted((field, int(weight)) for field, weight in weights.items()))
+    return signature
+
+async def diff_indexes(db) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare INDEX_SPECS against the live database.
+
+    Returns, per collection, the names of indexes that are ``missing``,
+    present but ``conflicting`` with the spec, and ``extra`` (live indexes
+    the spec does not know about).
+    """
+    report = {}
+    for collection_name, specs in INDEX_SPECS.items():
+        live = await db[collection_name].index_information()
+        wanted = {spec.document["name"]: spec for spec in specs}
+
+        missing, conflicting = [], []
+        for name, spec in wanted.items():
+            if name not in live:
+                missing.append(name)
+            elif _live_signature(live[name]) != _spec_signature(spec):
+                conflicting.append(name)
+
+        extra = [name for name in live if name != "_id_" and name not in wanted]
+        report[collection_name] = {
+            "missing": missing,
+            "conflicting": conflicting,
+            "extra": extra,
+        }
+    return report
+
+async def ensure_indexes(db, dry_run: bool = False) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Idempotently create every index in INDEX_SPECS that the live database lacks.
+
+    Extra and conflicting indexes are only reported, never dropped. Each
+    report entry also lists the indexes ``created`` and any that ``failed``.
+    """
+    report = await diff_indexes(db)
+    for collection_name, entry in report.items():
+        entry["created"], entry["failed"] = [], []
+        if dry_run or not entry["missing"]:
+            continue
+
+        specs = {spec.document["name"]: spec for spec in INDEX_SPECS[collection_name]}
+        for name in entry["missing"]:
+            try:
+                await db[collection_name].create_indexes([specs[name]])
+                entry["created"].append(name)
+            except OperationFailure as e:
+                logger.error(f"Failed to create index {collection_name}.{name}: {str(e)}")
+                entry["failed"].append(name)
+
+    for collection_name, entry in report.items():
+        if entry["extra"]:
+            logger.warning(f"Unmanaged indexes on {collection_name}: {', '.join(entry['extra'])}")
+        if entry["conflicting"]:
+            logger.warning(f"Indexes differing from spec on {collection_name}: {', '.join(entry['conflicting'])}")
+    return report
@@ -0,0 +1,49 @@
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from pymongo import monitoring
+
+class CommandCounter(monitoring.CommandListener):
+    """
+    Counts commands sent to MongoDB, by command name, and keeps the
+    ``find`` commands themselves so their plans can be explained.
+
+    Register it with ``pymongo.monitoring.register`` before the client is
+    created. Motor runs commands on worker threads, so updates are locked.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._finds: List[Tuple[str, Dict[str, Any]]] = []
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        with self._lock:
+            self._counts[event.command_name] += 1
+            if event.command_name == "find":
+                self._finds.append((event.database_name, dict(event.command)))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        pass
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def finds(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(database, command) of each find since the last reset"""
+        with self._lock:
+            return list(self._finds)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._finds.clear()
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
@@ -1,11 +1,20 @@
 import os
+import asyncio
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from app.core.config import settings
-from app.db.session import init_db, close_db
+from app.db.session import init_db, close_db, Database, get_collection
+from app.db.indexes import ensure_indexes
+from app.services.view_counter import view_counter
+from app.services.inverted_index import question_index
+from app.services.search import search_backend
+from app.services.token_revocation import revocation_store
+from app.services.storage import storage
+from app.services.workers import process_pool, derivative_pool
+from app.services.image_derivatives import derivative_pipeline
 from app.api.v1.router import api_router
 import logging
 
@@ -23,10 +32,40 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database connection initialized")
     
+    if settings.CREATE_INDEXES_ON_STARTUP:
+        try:
+            await ensure_indexes(Database.db)
+            logger.info("Database indexes verified")
+        except Exception as e:
+            logger.error(f"Index creation failed: {str(e)}")
+    
+    await search_backend.prepare()
+    
+    await storage.connect()
+    logger.info("Storage client initialized")
+    
+    view_counter.start()
+    await revocation_store.start()
+    derivative_pipeline.start()
+    
+    # Build the in-memory search index in the background; searches use the
+    # regex path until it is ready
+    index_build = None
+    if settings.SEARCH_BACKEND == "memory":
+        question_index.enabled = True
+        index_build = asyncio.create_task(question_index.build(get_collection("questions")))
+    
     yield
     
-    # Shutdown: Close database connection
+    # Shutdown: Flush buffered writes, then close database connection
     logger.info("Shutting down...")
+    if index_build is not None:
+        index_build.cancel()
+    await derivative_pipeline.stop()
+    await revocation_store.stop()
+    await view_counter.stop()
+    await storage.close()
+    await asyncio.gather(derivative_pool.shutdown(), process_pool.shutdown())
     await close_db()
     logger.info("Database connection closed")
 
@@ -57,4 +57,33 @@ class Question(QuestionBase):
         "json_encoders": {ObjectId: str},
         "populate_by_name": True,
         "arbitrary_types_allowed": True
-    } 
\ No newline at end of file
+    }
+
+class QuestionSummary(BaseModel):
+    """
+    List-card view of a question, read with a projection: the body is
+    replaced by an excerpt stored at write time. Fields outside the summary
+    are only filled when a list is asked for them (``fields=``).
+    """
+    id: Optional[PyObjectId] = Field(default=None, alias="_id")
+    title: str
+    excerpt: str = ""
+    tags: List[str] = Field(default_factory=list)
+    is_answered: bool = False
+    views: int = 0
+    votes: int = 0
+    answer_count: int = 0
+    status: str = "pending"
+    author_id: PyObjectId
+    author_name: str
+    created_at: datetime
+    updated_at: datetime
+    # Opt-in via fields=
+    content: Optional[str] = None
+    accepted_answer_id: Optional[PyObjectId] = None
+
+    model_config = {
+        "json_encoders": {ObjectId: str},
+        "populate_by_name": True,
+        "arbitrary_types_allowed": True
+    }
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Optional, Dict, Annotated
+from pydantic import BaseModel, Field, BeforeValidator
+from bson import ObjectId
+
+def validate_object_id(v):
+    if isinstance(v, ObjectId):
+        return v
+    if isinstance(v, str) and ObjectId.is_valid(v):
+        return ObjectId(v)
+    raise ValueError("Invalid ObjectId")
+
+PyObjectId = Annotated[ObjectId, BeforeValidator(validate_object_id)]
+
+class ImageDerivative(BaseModel):
+    """A resized copy of an uploaded image, stored next to the original"""
+    file_id: str
+    content_type: str = "image/webp"
+    width: int
+    height: int
+    size: int
+    # Signed URL, generated per response and never stored
+    url: Optional[str] = None
+
+class UploadBase(BaseModel):
+    file_id: str = Field(..., description="Path of the stored file in the storage backend")
+    filename: str
+    original_filename: str = ""
+    content_type: str = "application/octet-stream"
+    size: int = Field(0, ge=0)
+    folder: Optional[str] = None
+    metadata: Dict[str, str] = Field(default_factory=dict)
+    sha256: Optional[str] = Field(None, description="Content digest; identical content shares one stored file")
+    derivatives: Dict[str, ImageDerivative] = Field(default_factory=dict, description="Thumbnail and WebP copies of images, by name")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class UploadCreate(UploadBase):
+    pass
+
+class UploadInDB(UploadBase):
+    id: Optional[PyObjectId] = Field(default=None, alias="_id")
+    uploaded_by: Optional[PyObjectId] = None
+
+    model_config = {
+        "json_encoders": {ObjectId: str},
+        "populate_by_name": True,
+        "arbitrary_types_allowed": True
+    }
+
+class Upload(UploadInDB):
+    # Signed download URL, generated per response and never stored
+    url: Optional[str] = None
+    # Set on upload responses when the content was already stored
+    deduplicated: Optional[bool] = None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class UploadGrantRequest(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., gt=0, description="Exact size of the file in bytes")
+    folder: Optional[str] = None
+
+class UploadCommitRequest(BaseModel):
+    grant: str = Field(..., description="Grant token returned by /uploads/grant")
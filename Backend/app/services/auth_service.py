@@ -1,6 +1,6 @@
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token
 from beanie import PydanticObjectId
 from typing import Optional
 from datetime import datetime, timedelta
@@ -10,13 +10,13 @@ class AuthService:
     @staticmethod
     async def authenticate_user(email: str, password: str) -> Optional[User]:
         user = await User.find_one(User.email == email)
-        if user and verify_password(password, user.hashed_password):
+        if user and await verify_password_async(password, user.hashed_password):
             return user
         return None
 
     @staticmethod
     async def register_user(user_in: UserCreate) -> User:
-        hashed_password = get_password_hash(user_in.password)
+        hashed_password = await get_password_hash_async(user_in.password)
         user = User(
             email=user_in.email,
             hashed_password=hashed_password,
@@ -0,0 +1,122 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+from bson import ObjectId
+from app.core.config import settings
+from app.core.utils import naive_utc, next_or_none
+from app.crud.crud_file_object import file_object as crud_file_object
+from app.crud.crud_upload import upload as crud_upload
+from app.crud.crud_user import user as crud_user
+from app.models.upload import UploadInDB
+from app.services.storage import StoredBlob, storage
+from app.services.upload_service import delete_upload
+
+logger = logging.getLogger(__name__)
+
+# Blob names kept in the report, so a dry run shows what would go
+EXAMPLE_LIMIT = 20
+
+async def _drop_orphaned_records(batch: List[Dict[str, Any]], report: Dict[str, Any], dry_run: bool):
+    owners = await crud_user.existing_ids(record["uploaded_by"] for record in batch)
+    for record in batch:
+        if record["uploaded_by"] in owners:
+            continue
+        report["orphaned_records"] += 1
+        if not dry_run:
+            await delete_upload(UploadInDB(**record))
+
+async def _mark(report: Dict[str, Any], dry_run: bool):
+    """Remove upload records whose uploader has been deleted, a batch of owners at a time"""
+    batch = []
+    async for record in crud_upload.iter_owned(settings.BLOB_GC_BATCH_SIZE):
+        batch.append(record)
+        if len(batch) >= settings.BLOB_GC_BATCH_SIZE:
+            await _drop_orphaned_records(batch, report, dry_run)
+            batch = []
+    if batch:
+        await _drop_orphaned_records(batch, report, dry_run)
+
+def _is_garbage(blob: StoredBlob, referenced: Set[str], owners: Set[ObjectId], report: Dict[str, Any]) -> bool:
+    """Whether an unreferenced blob can go; counts the reason if not"""
+    original = blob.metadata.get("derivative_of")
+    if original:
+        if original in referenced:
+            report["referenced"] += 1
+            return False
+        return True
+
+    owner = blob.metadata.get("uploaded_by")
+    if owner and ObjectId.is_valid(owner) and ObjectId(owner) in owners:
+        # A failed write-through; reconcile_uploads restores its record
+        report["unrecorded"] += 1
+        return False
+    return True
+
+async def _sweep(candidates: List[StoredBlob], report: Dict[str, Any], dry_run: bool):
+    """Delete the unreferenced blobs of a batch that nothing still needs, looked up in two queries"""
+    referenced = await crud_upload.referenced_file_ids(
+        blob.metadata["derivative_of"] for blob in candidates if blob.metadata.get("derivative_of")
+    )
+    owners = await crud_user.existing_ids(
+        ObjectId(blob.metadata["uploaded_by"]) for blob in candidates
+        if not blob.metadata.get("derivative_of") and ObjectId.is_valid(blob.metadata.get("uploaded_by") or "")
+    )
+    for blob in candidates:
+        if not _is_garbage(blob, referenced, owners, report):
+            continue
+
+        report["deleted"] += 1
+        report["deleted_bytes"] += blob.size
+        if len(report["examples"]) < EXAMPLE_LIMIT:
+            report["examples"].append(blob.name)
+        if not dry_run:
+            await storage.delete_file(blob.name)
+            await crud_file_object.forget(blob.name)
+
+async def collect_garbage(dry_run: bool = False, grace_period: Optional[timedelta] = None) -> Dict[str, Any]:
+    """
+    Delete stored files that no upload record references.
+
+    Mark: upload records whose uploader no longer exists are deleted
+    through the normal refcounted path, so content nobody else shares goes
+    with them. Sweep: the blob listing and the upload records are both
+    streamed in file_id order and merge-joined, so memory use stays
+    constant. Unreferenced blobs older than ``grace_period`` are deleted,
+    except those whose uploader still exists (reconcile_uploads adopts
+    them). Image derivatives live as long as their original has a record.
+    Those checks are resolved BLOB_GC_BATCH_SIZE candidates at a time.
+    """
+    if grace_period is None:
+        grace_period = timedelta(seconds=settings.BLOB_GC_GRACE_PERIOD)
+    cutoff = datetime.utcnow() - grace_period
+    report: Dict[str, Any] = {
+        "orphaned_records": 0, "blobs": 0, "referenced": 0, "recent": 0,
+        "unrecorded": 0, "deleted": 0, "deleted_bytes": 0, "examples": []
+    }
+
+    await _mark(report, dry_run)
+
+    records = crud_upload.iter_sorted(settings.BLOB_GC_BATCH_SIZE).__aiter__()
+    record = await next_or_none(records)
+    candidates: List[StoredBlob] = []
+    async for blob in storage.iter_blobs():
+        report["blobs"] += 1
+        while record is not None and record["file_id"] < blob.name:
+            record = await next_or_none(records)
+        if record is not None and record["file_id"] == blob.name:
+            report["referenced"] += 1
+            continue
+
+        if naive_utc(blob.last_modified or blob.created_at) > cutoff:
+            report["recent"] += 1
+            continue
+        candidates.append(blob)
+        if len(candidates) >= settings.BLOB_GC_BATCH_SIZE:
+            await _sweep(candidates, report, dry_run)
+            candidates = []
+    if candidates:
+        await _sweep(candidates, report, dry_run)
+
+    counts = {key: value for key, value in report.items() if key != "examples"}
+    logger.info(f"Blob garbage collection{' (dry run)' if dry_run else ''}: {counts}")
+    return report
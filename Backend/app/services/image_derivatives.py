@@ -0,0 +1,162 @@
+import io
+import os
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.crud.crud_upload import upload as crud_upload
+from app.models.upload import ImageDerivative, UploadInDB
+from app.services.storage import storage
+from app.services.workers import derivative_pool
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow missing: images are served without derivatives
+    Image = ImageOps = None
+
+# Formats Pillow decodes that are worth re-encoding
+IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/bmp", "image/tiff"}
+
+# What render_derivatives produces; each has an index on its file_id (app/db/indexes.py)
+DERIVATIVE_NAMES = ("thumbnail", "display")
+
+def render_derivatives(
+    data: bytes, thumbnail_size: int, max_dimension: int, quality: int
+) -> Dict[str, Tuple[bytes, int, int]]:
+    """
+    Encode a square thumbnail and a size-capped display copy of an image, both WebP.
+
+    Runs in a worker process; returns {name: (webp bytes, width, height)}.
+    """
+    Image.MAX_IMAGE_PIXELS = max_dimension * max_dimension * 16
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+        variants = {"thumbnail": ImageOps.fit(image, (thumbnail_size, thumbnail_size))}
+        display = image.copy()
+        display.thumbnail((max_dimension, max_dimension))
+        variants["display"] = display
+
+        rendered = {}
+        for name, variant in variants.items():
+            buffer = io.BytesIO()
+            variant.save(buffer, "WEBP", quality=quality, method=4)
+            rendered[name] = (buffer.getvalue(), variant.width, variant.height)
+        return rendered
+
+def derivative_file_id(file_id: str, name: str) -> str:
+    """Derivatives sit next to their original: a/b.png -> a/b.thumbnail.webp"""
+    return f"{os.path.splitext(file_id)[0]}.{name}.webp"
+
+def wants_derivatives(upload: UploadInDB) -> bool:
+    return Image is not None and upload.content_type in IMAGE_TYPES and not upload.derivatives
+
+async def get_derivative_owner(
+    file_id: str, user_id: Optional[str] = None
+) -> Optional[Tuple[UploadInDB, ImageDerivative]]:
+    """Upload record (``user_id``'s own, if given) and derivative entry for a derivative's file id"""
+    # The name is part of the id (see derivative_file_id), so one indexed
+    # lookup finds the owner and other ids need no query at all
+    parts = file_id.rsplit(".", 2)
+    if len(parts) != 3 or parts[2] != "webp" or parts[1] not in DERIVATIVE_NAMES:
+        return None
+    name = parts[1]
+    upload = await crud_upload.get_by_derivative(name, file_id, user_id)
+    if upload is None or name not in upload.derivatives:
+        return None
+    return upload, upload.derivatives[name]
+
+class DerivativePipeline:
+    """
+    Background generator of image thumbnails and WebP copies.
+
+    Uploads enqueue their file id and return immediately; worker tasks read
+    the original from storage, render in the derivative process pool (one
+    task per pool worker), store the results next to the original and record
+    them on every upload record for the file. A full queue drops work rather
+    than slowing uploads down.
+    """
+
+    def __init__(self, concurrency: int, max_queued: int):
+        self.concurrency = concurrency
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._tasks = []
+        # Stats
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def enqueue(self, upload: UploadInDB) -> bool:
+        if not wants_derivatives(upload):
+            return False
+        try:
+            self._queue.put_nowait(upload.file_id)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Derivative queue full; skipping {upload.file_id}")
+            return False
+
+    async def process(self, file_id: str) -> Dict[str, ImageDerivative]:
+        """Generate and record derivatives for one stored image"""
+        upload = await crud_upload.get_by_file_id(file_id)
+        if upload is None or upload.derivatives:
+            return upload.derivatives if upload else {}
+
+        data = await storage.read_file(file_id, settings.IMAGE_DERIVATIVE_MAX_BYTES)
+        if data is None:
+            return {}
+        rendered = await derivative_pool.run(
+            render_derivatives, data, settings.THUMBNAIL_SIZE, settings.WEBP_MAX_DIMENSION, settings.WEBP_QUALITY
+        )
+
+        derivatives = {}
+        for name, (content, width, height) in rendered.items():
+            derivative_id = derivative_file_id(file_id, name)
+            await storage.put_file(
+                derivative_id, content, "image/webp", {"derivative_of": file_id, "derivative": name}
+            )
+            derivatives[name] = ImageDerivative(file_id=derivative_id, width=width, height=height, size=len(content))
+
+        if not await crud_upload.update(file_id, {"derivatives": {name: d.model_dump(exclude={"url"}) for name, d in derivatives.items()}}):
+            # The upload was deleted while we worked
+            for derivative in derivatives.values():
+                await storage.delete_file(derivative.file_id)
+            return {}
+        return derivatives
+
+    async def _run(self):
+        while True:
+            file_id = await self._queue.get()
+            try:
+                await self.process(file_id)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to generate derivatives for {file_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def start(self):
+        if not self._tasks and Image is not None:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped
+        }
+
+# Create a singleton instance; workers are started in the app lifespan
+derivative_pipeline = DerivativePipeline(concurrency=settings.DERIVATIVE_PROCESSES, max_queued=settings.DERIVATIVE_QUEUE_SIZE)
@@ -0,0 +1,171 @@
+import heapq
+import logging
+import math
+import re
+from array import array
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from how i if in into is it its of on or "
+    "that the their then there these this to was what when where which who why "
+    "will with you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+class InvertedIndex:
+    """
+    In-memory BM25 index over question titles and content.
+
+    Documents get a dense ordinal on insert. Each term maps to two parallel
+    arrays, the ordinals containing it and the (title-boosted) term
+    frequencies, so postings cost a few bytes per entry rather than a dict
+    per document. Ordinals only grow, which keeps postings sorted.
+
+    Deletes and updates tombstone the old ordinal; tombstoned entries are
+    skipped at query time and dropped by ``compact``, which runs once they
+    make up ``compact_ratio`` of the index.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: int = 3, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.compact_ratio = compact_ratio
+        self.enabled = False
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self._doc_ids: List[Optional[ObjectId]] = []
+        self._ordinals: Dict[ObjectId, int] = {}
+        self._doc_lengths = array("I")
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._total_length = 0
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def add(self, doc_id: ObjectId, title: str, content: str):
+        """Index a question, replacing any previous version of it"""
+        if doc_id in self._ordinals:
+            self.remove(doc_id)
+
+        frequencies: Dict[str, int] = {}
+        for token in tokenize(title):
+            frequencies[token] = frequencies.get(token, 0) + self.title_weight
+        for token in tokenize(content):
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+        ordinal = len(self._doc_ids)
+        length = sum(frequencies.values())
+        self._doc_ids.append(doc_id)
+        self._ordinals[doc_id] = ordinal
+        self._doc_lengths.append(length)
+        self._total_length += length
+
+        for token, tf in frequencies.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = (array("I"), array("H"))
+            postings[0].append(ordinal)
+            postings[1].append(min(tf, 0xFFFF))
+
+    def remove(self, doc_id: ObjectId) -> bool:
+        ordinal = self._ordinals.pop(doc_id, None)
+        if ordinal is None:
+            return False
+
+        self._doc_ids[ordinal] = None
+        self._total_length -= self._doc_lengths[ordinal]
+        self._deleted += 1
+
+        if self._deleted > self.compact_ratio * len(self._doc_ids):
+            self.compact()
+        return True
+
+    def compact(self):
+        """Renumber live documents and drop tombstoned postings"""
+        remap = array("i", [-1]) * len(self._doc_ids)
+        doc_ids, doc_lengths = [], array("I")
+        for ordinal, doc_id in enumerate(self._doc_ids):
+            if doc_id is not None:
+                remap[ordinal] = len(doc_ids)
+                doc_ids.append(doc_id)
+                doc_lengths.append(self._doc_lengths[ordinal])
+
+        postings = {}
+        for token, (ordinals, frequencies) in self._postings.items():
+            new_ordinals, new_frequencies = array("I"), array("H")
+            for ordinal, tf in zip(ordinals, frequencies):
+                if remap[ordinal] >= 0:
+                    new_ordinals.append(remap[ordinal])
+                    new_frequencies.append(tf)
+            if new_ordinals:
+                postings[token] = (new_ordinals, new_frequencies)
+
+        self._doc_ids = doc_ids
+        self._ordinals = {doc_id: ordinal for ordinal, doc_id in enumerate(doc_ids)}
+        self._doc_lengths = doc_lengths
+        self._postings = postings
+        self._deleted = 0
+
+    def search(self, query: str, skip: int = 0, limit: int = 20) -> Tuple[List[ObjectId], int]:
+        """Return the ids of the best BM25 matches for ``query`` and the total match count"""
+        live_docs = len(self._ordinals)
+        if not live_docs:
+            return [], 0
+
+        avg_length = self._total_length / live_docs
+        k1, b = self.k1, self.b
+        doc_ids, doc_lengths = self._doc_ids, self._doc_lengths
+        scores: Dict[int, float] = {}
+
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            ordinals, frequencies = postings
+            # Document frequency may include tombstones until the next compaction
+            df = len(ordinals)
+            idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+            for ordinal, tf in zip(ordinals, frequencies):
+                if doc_ids[ordinal] is None:
+                    continue
+                norm = k1 * (1 - b + b * doc_lengths[ordinal] / avg_length)
+                scores[ordinal] = scores.get(ordinal, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(skip + limit, scores.items(), key=lambda item: item[1])
+        return [doc_ids[ordinal] for ordinal, _ in top[skip:]], len(scores)
+
+    async def build(self, collection, batch_size: int = 1000):
+        """(Re)build the index by streaming every question from ``collection``"""
+        self.ready = False
+        self._reset()
+        cursor = collection.find({}, {"title": 1, "content": 1}).batch_size(batch_size)
+        try:
+            async for question_data in cursor:
+                self.add(question_data["_id"], question_data.get("title", ""), question_data.get("content", ""))
+        except Exception as e:
+            logger.error(f"Failed to build question search index: {str(e)}")
+            return
+        self.ready = True
+        logger.info(f"Question search index built with {len(self)} documents and {len(self._postings)} terms")
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by postings and per-document arrays"""
+        postings = sum(
+            ordinals.buffer_info()[1] * ordinals.itemsize + frequencies.buffer_info()[1] * frequencies.itemsize
+            for ordinals, frequencies in self._postings.values()
+        )
+        return postings + self._doc_lengths.buffer_info()[1] * self._doc_lengths.itemsize
+
+# Create a singleton instance; enabled at startup when SEARCH_BACKEND is "memory"
+question_index = InvertedIndex()
@@ -0,0 +1,75 @@
+import logging
+from typing import Optional
+from fastapi import HTTPException, status
+from app.services.workers import process_pool
+
+logger = logging.getLogger(__name__)
+
+try:
+    import magic
+except ImportError:  # libmagic missing: trust declared content types
+    magic = None
+
+# Content libmagic cannot tell apart from generic text or binary (CSV, JSON,
+# source code, ...); these never contradict a declared non-media type
+GENERIC_TYPES = {"application/octet-stream", "text/plain"}
+
+# Executables are rejected whatever they claim to be
+BLOCKED_TYPES = {
+    "application/x-dosexec",
+    "application/x-executable",
+    "application/x-pie-executable",
+    "application/x-sharedlib",
+    "application/x-mach-binary",
+    "application/x-msdownload",
+}
+
+ALIASES = {
+    "image/jpg": "image/jpeg",
+    "image/pjpeg": "image/jpeg",
+    "text/xml": "application/xml",
+    "application/x-zip-compressed": "application/zip",
+}
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    """Detect a MIME type from the first bytes of a file (runs in a worker process)"""
+    if magic is None:
+        return None
+    return magic.from_buffer(head, mime=True)
+
+def _normalize(content_type: str) -> str:
+    base = content_type.split(";", 1)[0].strip().lower()
+    return ALIASES.get(base, base)
+
+async def validate_content_type(head: bytes, declared: Optional[str]) -> str:
+    """
+    Check an upload's declared content type against its sniffed one.
+
+    Returns the content type to store: the declared one, or the sniffed one
+    when nothing specific was declared. Raises 415 for blocked content and
+    for content that contradicts a specific declared type.
+    """
+    sniffed = await process_pool.run(sniff_mime, head) if magic is not None and head else None
+    declared = _normalize(declared) if declared else "application/octet-stream"
+    if sniffed is None:
+        return declared
+
+    sniffed = _normalize(sniffed)
+    if sniffed in BLOCKED_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Executable files are not allowed"
+        )
+
+    if declared == "application/octet-stream":
+        return sniffed
+    if sniffed == declared:
+        return declared
+    if sniffed in GENERIC_TYPES and declared.split("/")[0] not in ("image", "audio", "video"):
+        return declared
+
+    logger.info(f"Rejected upload declared as {declared} but sniffed as {sniffed}")
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=f"File content ({sniffed}) does not match its declared type ({declared})"
+    )
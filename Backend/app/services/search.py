@@ -0,0 +1,104 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from pymongo import TEXT
+from app.core.config import settings
+from app.crud.crud_question import question as crud_question
+from app.models.question import QuestionInDB
+from app.services.inverted_index import question_index
+
+logger = logging.getLogger(__name__)
+
+class SearchBackend(ABC):
+    """
+    Question search strategy used by the /search/ endpoint.
+
+    ``prepare()`` runs once in the app lifespan, after the database is
+    connected. With a ``summary_projection``, results are QuestionSummary
+    items.
+    """
+    name = "base"
+
+    async def prepare(self):
+        pass
+
+    @abstractmethod
+    async def search(
+        self, query: str, skip: int = 0, limit: int = 20, projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[QuestionInDB], int]:
+        """A page of matching questions and the total number of matches"""
+
+class TextIndexSearchBackend(SearchBackend):
+    """
+    Weighted Mongo text index, ranked by textScore in one round trip.
+
+    Indexes are only created at startup with CREATE_INDEXES_ON_STARTUP (or
+    by scripts/init_indexes.py), so ``prepare`` checks for the text index
+    and falls back to regex matching without it rather than failing every
+    search.
+    """
+    name = "text"
+
+    def __init__(self):
+        self.text_index = True
+
+    async def prepare(self):
+        try:
+            indexes = await crud_question.collection.index_information()
+        except Exception as e:
+            logger.error(f"Could not check for the questions text index: {str(e)}")
+            return
+        self.text_index = any(
+            value == TEXT or field == "_fts" for index in indexes.values() for field, value in index["key"]
+        )
+        if not self.text_index:
+            logger.warning(
+                "No text index on questions; search falls back to regex matching. "
+                "Run scripts/init_indexes.py or set CREATE_INDEXES_ON_STARTUP."
+            )
+
+    async def search(
+        self, query: str, skip: int = 0, limit: int = 20, projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[QuestionInDB], int]:
+        if not self.text_index:
+            return await crud_question.regex_search(query, skip=skip, limit=limit, projection=projection)
+        return await crud_question.text_search(query, skip=skip, limit=limit, projection=projection)
+
+class RegexSearchBackend(SearchBackend):
+    """Unindexed case-insensitive substring match, for servers without the text index"""
+    name = "regex"
+
+    async def search(
+        self, query: str, skip: int = 0, limit: int = 20, projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[QuestionInDB], int]:
+        return await crud_question.regex_search(query, skip=skip, limit=limit, projection=projection)
+
+class InMemorySearchBackend(SearchBackend):
+    """
+    In-process BM25 inverted index, for deployments without server-side text indexes.
+
+    Falls back to the regex backend while the index is still being built.
+    """
+    name = "memory"
+
+    async def search(
+        self, query: str, skip: int = 0, limit: int = 20, projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[QuestionInDB], int]:
+        if not question_index.ready:
+            return await crud_question.regex_search(query, skip=skip, limit=limit, projection=projection)
+        question_ids, total = question_index.search(query, skip=skip, limit=limit)
+        return await crud_question.get_many(question_ids, projection), total
+
+SEARCH_BACKENDS = {
+    backend.name: backend
+    for backend in (TextIndexSearchBackend, RegexSearchBackend, InMemorySearchBackend)
+}
+
+def get_search_backend(name: str) -> SearchBackend:
+    try:
+        return SEARCH_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown search backend '{name}'. Choose one of: {', '.join(SEARCH_BACKENDS)}")
+
+# Create a singleton instance
+search_backend = get_search_backend(settings.SEARCH_BACKEND)
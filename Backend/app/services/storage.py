@@ -1,27 +1,119 @@
 import os
-from datetime import datetime, timedelta
-from typing import Optional, BinaryIO, Dict, Any
-from azure.storage.blob import BlobServiceClient, BlobSasPermissions, generate_blob_sas
+import json
+import uuid
+import base64
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, BinaryIO, Dict, Any, AsyncIterator, List, NamedTuple, Tuple
+import aiohttp
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.storage.blob import BlobBlock, BlobSasPermissions, ContentSettings, generate_blob_sas
+from azure.storage.blob.aio import BlobServiceClient
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.exceptions import BadRequestException
 
-class AzureBlobStorage:
-    def __init__(self):
-        self.connection_string = (
-            f"DefaultEndpointsProtocol=https;"
-            f"AccountName={settings.AZURE_STORAGE_ACCOUNT_NAME};"
-            f"AccountKey={settings.AZURE_STORAGE_ACCOUNT_KEY};"
-            f"EndpointSuffix=core.windows.net"
-        )
-        self.container_name = settings.AZURE_STORAGE_CONTAINER
-        self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
-        self.container_client = self.blob_service_client.get_container_client(self.container_name)
-        
-        # Create container if it doesn't exist
-        try:
-            self.container_client.create_container()
-        except ResourceExistsError:
-            pass
+logger = logging.getLogger(__name__)
+
+class StoredBlob(NamedTuple):
+    """Backend-neutral view of a stored file, as returned by listings"""
+    name: str
+    size: int
+    content_type: Optional[str]
+    metadata: Dict[str, str]
+    created_at: Optional[datetime]
+    last_modified: Optional[datetime]
+
+class StagedUpload(NamedTuple):
+    """Bytes written to storage but not yet visible; see ``stage_stream``"""
+    file_id: str
+    filename: str
+    original_filename: str
+    folder: Optional[str]
+    size: int
+    handle: Any  # Backend-specific: Azure block list, local temp file path
+
+class StorageBackend(ABC):
+    """
+    File storage used by the /uploads endpoints.
+
+    Backends are selected by STORAGE_BACKEND and opened by ``connect()`` in
+    the app lifespan. ``serves_downloads`` is True when the API streams file
+    bytes itself; otherwise ``file_url`` is a URL the client fetches from
+    the backend directly. Direct uploads (``create_upload_url`` and
+    ``set_metadata``) are optional and only implemented by backends with
+    ``supports_direct_upload``.
+    """
+    name = "base"
+    serves_downloads = False
+    supports_direct_upload = False
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def check(self) -> Dict[str, Any]:
+        """Raise if the backend is unreachable; otherwise describe it for /health/storage"""
+
+    @abstractmethod
+    def file_url(self, file_id: str) -> str:
+        """Download URL for a file"""
+
+    def stats(self) -> Dict[str, Any]:
+        """In-process counters for /health/metrics"""
+        return {}
+
+    def local_path(self, file_id: str) -> Optional[Path]:
+        """On-disk path of a file, for backends with ``serves_downloads``"""
+        return None
+
+    @abstractmethod
+    async def stage_stream(
+        self,
+        blocks: AsyncIterator[bytes],
+        filename: str,
+        folder: Optional[str] = None
+    ) -> StagedUpload:
+        """
+        Write ``blocks`` under a new file id without making the file visible.
+
+        Follow with ``commit_staged`` to publish it or ``discard_staged`` to
+        drop it, e.g. when the content turns out to be stored already.
+        """
+
+    @abstractmethod
+    async def commit_staged(
+        self,
+        staged: StagedUpload,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Publish a staged file under its file id"""
+
+    @abstractmethod
+    async def discard_staged(self, staged: StagedUpload):
+        """Drop a staged file without publishing it"""
+
+    async def upload_stream(
+        self,
+        blocks: AsyncIterator[bytes],
+        filename: str,
+        content_type: str,
+        folder: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload a file from an async iterator of blocks
+        """
+        staged = await self.stage_stream(blocks, filename, folder)
+        return await self.commit_staged(staged, content_type, metadata)
 
     async def upload_file(
         self,
@@ -32,104 +124,520 @@ class AzureBlobStorage:
         metadata: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
-        Upload a file to Azure Blob Storage
+        Upload an in-memory or on-disk file
+        """
+        async def blocks():
+            file_data.seek(0)
+            while True:
+                block = file_data.read(settings.UPLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+
+        return await self.upload_stream(blocks(), filename, content_type, folder, metadata)
+
+    def create_upload_url(
+        self, filename: str, folder: Optional[str], lifetime: timedelta
+    ) -> Tuple[str, str, Dict[str, str]]:
+        """
+        Reserve a file id and a write-only URL the client can upload it to.
+
+        Returns (file_id, url, headers the client must send with its PUT).
+        Only backends with ``supports_direct_upload`` implement this.
         """
+        raise BadRequestException(f"Direct uploads are not supported by the {self.name} storage backend")
+
+    @abstractmethod
+    async def read_file(self, file_id: str, max_size: int) -> Optional[bytes]:
+        """Whole contents of a file; None if it is missing or larger than ``max_size``"""
+
+    @abstractmethod
+    async def put_file(self, file_id: str, data: bytes, content_type: str, metadata: Dict[str, str]):
+        """Write a small file under a fixed id, replacing any existing one"""
+
+    async def set_metadata(self, file_id: str, metadata: Dict[str, str]):
+        """Replace a file's metadata. Only backends with ``supports_direct_upload`` implement this."""
+        raise BadRequestException(f"Direct uploads are not supported by the {self.name} storage backend")
+
+    @abstractmethod
+    async def delete_file(self, file_id: str) -> bool:
+        """Delete a file; False if it did not exist"""
+
+    @abstractmethod
+    async def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Size, type and metadata of a file; None if it does not exist"""
+
+    @abstractmethod
+    def iter_blobs(self, folder: Optional[str] = None) -> AsyncIterator[StoredBlob]:
+        """Every stored file in name order"""
+
+    def _new_blob_path(self, filename: str, folder: Optional[str] = None) -> Tuple[str, str]:
         # Generate a unique filename to avoid collisions
         file_extension = os.path.splitext(filename)[1].lower()
         unique_filename = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{os.urandom(4).hex()}{file_extension}"
-        
+
         # Construct the blob path
         if folder:
-            blob_path = f"{folder}/{unique_filename}"
-        else:
-            blob_path = unique_filename
-        
-        # Upload the file
-        blob_client = self.container_client.get_blob_client(blob_path)
-        
-        # Set content type and metadata
-        blob_metadata = metadata or {}
-        blob_metadata.update({
+            return f"{folder}/{unique_filename}", unique_filename
+        return unique_filename, unique_filename
+
+    def _blob_metadata(self, filename: str, content_type: str, metadata: Optional[Dict[str, str]]) -> Dict[str, str]:
+        return {
+            **(metadata or {}),
             "original_filename": filename,
             "content_type": content_type,
             "uploaded_at": datetime.utcnow().isoformat()
-        })
-        
-        # Upload the file
-        file_data.seek(0)
-        blob_client.upload_blob(
-            file_data,
-            content_type=content_type,
-            metadata=blob_metadata,
-            overwrite=True
-        )
-        
-        # Generate a SAS URL for the uploaded file (valid for 7 days)
-        sas_token = generate_blob_sas(
-            account_name=settings.AZURE_STORAGE_ACCOUNT_NAME,
-            account_key=settings.AZURE_STORAGE_ACCOUNT_KEY,
-            container_name=self.container_name,
-            blob_name=blob_path,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(days=7)
-        )
-        
-        # Construct the URL
-        blob_url = f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{self.container_name}/{blob_path}?{sas_token}"
-        
+        }
+
+    def _upload_result(
+        self, blob_path: str, unique_filename: str, filename: str, content_type: str,
+        size: int, folder: Optional[str], blob_metadata: Dict[str, str]
+    ) -> Dict[str, Any]:
         return {
             "file_id": blob_path,
             "filename": unique_filename,
             "original_filename": filename,
-            "url": blob_url,
+            "url": self.file_url(blob_path),
             "content_type": content_type,
-            "size": file_data.tell(),
+            "size": size,
             "folder": folder,
             "metadata": blob_metadata
         }
 
+    def _file_info(self, blob: StoredBlob) -> Dict[str, Any]:
+        return {
+            "file_id": blob.name,
+            "filename": os.path.basename(blob.name),
+            "original_filename": blob.metadata.get("original_filename", ""),
+            "url": self.file_url(blob.name),
+            "content_type": blob.content_type,
+            "size": blob.size,
+            "created_at": blob.created_at.isoformat() if blob.created_at else None,
+            "last_modified": blob.last_modified.isoformat() if blob.last_modified else None,
+            "metadata": dict(blob.metadata)
+        }
+
+class AzureBlobStorage(StorageBackend):
+    """
+    Azure Blob Storage on the async SDK.
+
+    Clients are created in ``connect()`` (called from the app lifespan), not
+    at import time. Every container and blob client shares one pooled
+    aiohttp session, so uploads and metadata calls reuse connections instead
+    of blocking the event loop. Point AZURE_STORAGE_CONNECTION_STRING at
+    Azurite to run against a local emulator.
+
+    SAS URLs are cached per (blob, permission) and reused until
+    SAS_URL_REFRESH_FRACTION of their lifetime has passed, so a blob keeps
+    one stable URL that browsers and CDNs can cache.
+    """
+    name = "azure"
+    supports_direct_upload = True
+
+    def __init__(self):
+        self.container_name = settings.AZURE_STORAGE_CONTAINER
+        self.blob_service_client: Optional[BlobServiceClient] = None
+        self.container_client = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.sas_lifetime = timedelta(seconds=settings.SAS_URL_LIFETIME)
+        self.sas_cache = TTLCache(
+            settings.SAS_URL_CACHE_SIZE,
+            settings.SAS_URL_LIFETIME * settings.SAS_URL_REFRESH_FRACTION
+        )
+
+    @property
+    def connection_string(self) -> str:
+        if settings.AZURE_STORAGE_CONNECTION_STRING:
+            return settings.AZURE_STORAGE_CONNECTION_STRING
+        return (
+            f"DefaultEndpointsProtocol=https;"
+            f"AccountName={settings.AZURE_STORAGE_ACCOUNT_NAME};"
+            f"AccountKey={settings.AZURE_STORAGE_ACCOUNT_KEY};"
+            f"EndpointSuffix=core.windows.net"
+        )
+
+    async def connect(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.AZURE_STORAGE_MAX_CONNECTIONS)
+        )
+        transport = AioHttpTransport(session=self._session, session_owner=False)
+        self.blob_service_client = BlobServiceClient.from_connection_string(
+            self.connection_string, transport=transport
+        )
+        self.container_client = self.blob_service_client.get_container_client(self.container_name)
+
+        # Create container if it doesn't exist
+        try:
+            await self.container_client.create_container()
+        except ResourceExistsError:
+            pass
+        except Exception as e:
+            # Leave the clients in place; /health/storage reports the failure
+            logger.error(f"Failed to initialize storage container: {str(e)}")
+
+    async def close(self):
+        if self.blob_service_client is not None:
+            await self.blob_service_client.close()
+        if self._session is not None:
+            await self._session.close()
+
+    async def check(self) -> Dict[str, Any]:
+        # This will raise an exception if the connection fails
+        await self.container_client.get_container_properties()
+        return {"type": "Azure Blob Storage", "container": self.container_name}
+
+    def _sign(self, blob_path: str, permission: str, lifetime: timedelta) -> str:
+        credential = self.blob_service_client.credential
+        sas_token = generate_blob_sas(
+            account_name=credential.account_name,
+            account_key=credential.account_key,
+            container_name=self.container_name,
+            blob_name=blob_path,
+            permission=BlobSasPermissions.from_string(permission),
+            expiry=datetime.utcnow() + lifetime
+        )
+        blob_url = self.container_client.get_blob_client(blob_path).url
+        return f"{blob_url}?{sas_token}"
+
+    def _sas_url(self, blob_path: str, permission: str = "r") -> str:
+        """Signed URL for ``blob_path``; cached, so repeat calls return the same URL"""
+        key = (blob_path, permission)
+        url = self.sas_cache.get(key)
+        if url is None:
+            url = self._sign(blob_path, permission, self.sas_lifetime)
+            self.sas_cache.set(key, url)
+        return url
+
+    def file_url(self, file_id: str) -> str:
+        """Signed read URL; computed locally, no request is made"""
+        return self._sas_url(file_id, "r")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sas_cache": self.sas_cache.stats()}
+
+    def create_upload_url(
+        self, filename: str, folder: Optional[str], lifetime: timedelta
+    ) -> Tuple[str, str, Dict[str, str]]:
+        # Create + write only: the URL cannot read, list or delete anything
+        blob_path, _ = self._new_blob_path(filename, folder)
+        url = self._sign(blob_path, "cw", lifetime)
+        return blob_path, url, {"x-ms-blob-type": "BlockBlob"}
+
+    async def set_metadata(self, file_id: str, metadata: Dict[str, str]):
+        blob_client = self.container_client.get_blob_client(file_id)
+        await blob_client.set_blob_metadata(metadata)
+
+    async def read_file(self, file_id: str, max_size: int) -> Optional[bytes]:
+        blob_client = self.container_client.get_blob_client(file_id)
+        try:
+            downloader = await blob_client.download_blob()
+        except ResourceNotFoundError:
+            return None
+        if downloader.size > max_size:
+            return None
+        return await downloader.readall()
+
+    async def put_file(self, file_id: str, data: bytes, content_type: str, metadata: Dict[str, str]):
+        self.sas_cache.invalidate((file_id, "r"))
+        blob_client = self.container_client.get_blob_client(file_id)
+        await blob_client.upload_blob(
+            data,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type),
+            metadata=metadata
+        )
+
+    async def stage_stream(
+        self,
+        blocks: AsyncIterator[bytes],
+        filename: str,
+        folder: Optional[str] = None
+    ) -> StagedUpload:
+        """
+        Stage a file as blob blocks, one block in memory at a time.
+
+        Nothing is visible until ``commit_staged`` commits the block list;
+        Azure discards uncommitted blocks on its own, so discarding is free.
+        """
+        blob_path, unique_filename = self._new_blob_path(filename, folder)
+        blob_client = self.container_client.get_blob_client(blob_path)
+
+        block_list = []
+        size = 0
+        async for block in blocks:
+            # Block ids must all have the same length within a blob
+            block_id = base64.b64encode(f"{len(block_list):08d}".encode()).decode()
+            await blob_client.stage_block(block_id, block, length=len(block))
+            block_list.append(BlobBlock(block_id=block_id))
+            size += len(block)
+
+        return StagedUpload(blob_path, unique_filename, filename, folder, size, block_list)
+
+    async def commit_staged(
+        self,
+        staged: StagedUpload,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        blob_client = self.container_client.get_blob_client(staged.file_id)
+        blob_metadata = self._blob_metadata(staged.original_filename, content_type, metadata)
+        await blob_client.commit_block_list(
+            staged.handle,
+            content_settings=ContentSettings(content_type=content_type),
+            metadata=blob_metadata
+        )
+        return self._upload_result(
+            staged.file_id, staged.filename, staged.original_filename, content_type,
+            staged.size, staged.folder, blob_metadata
+        )
+
+    async def discard_staged(self, staged: StagedUpload):
+        pass
+
     async def delete_file(self, file_id: str) -> bool:
         """
         Delete a file from Azure Blob Storage
         """
+        self.sas_cache.invalidate((file_id, "r"))
         try:
             blob_client = self.container_client.get_blob_client(file_id)
-            blob_client.delete_blob()
+            await blob_client.delete_blob()
             return True
         except ResourceNotFoundError:
             return False
 
+    def _stored_blob(self, name: str, properties) -> StoredBlob:
+        return StoredBlob(
+            name=name,
+            size=properties.size,
+            content_type=properties.content_settings.content_type,
+            metadata=dict(properties.metadata or {}),
+            created_at=properties.creation_time,
+            last_modified=properties.last_modified
+        )
+
     async def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
         """
         Get information about a file
         """
         try:
             blob_client = self.container_client.get_blob_client(file_id)
-            properties = blob_client.get_blob_properties()
-            
-            # Generate a SAS URL for the file (valid for 1 hour)
-            sas_token = generate_blob_sas(
-                account_name=settings.AZURE_STORAGE_ACCOUNT_NAME,
-                account_key=settings.AZURE_STORAGE_ACCOUNT_KEY,
-                container_name=self.container_name,
-                blob_name=file_id,
-                permission=BlobSasPermissions(read=True),
-                expiry=datetime.utcnow() + timedelta(hours=1)
-            )
-            
-            return {
-                "file_id": file_id,
-                "filename": os.path.basename(file_id),
-                "original_filename": properties.metadata.get("original_filename", ""),
-                "url": f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{self.container_name}/{file_id}?{sas_token}",
-                "content_type": properties.content_settings.content_type,
-                "size": properties.size,
-                "created_at": properties.creation_time.isoformat() if properties.creation_time else None,
-                "last_modified": properties.last_modified.isoformat() if properties.last_modified else None,
-                "metadata": dict(properties.metadata)
-            }
+            properties = await blob_client.get_blob_properties()
+            return self._file_info(self._stored_blob(file_id, properties))
         except ResourceNotFoundError:
             return None
 
-# Create a singleton instance
-storage = AzureBlobStorage() 
\ No newline at end of file
+    async def iter_blobs(self, folder: Optional[str] = None):
+        """Every blob (with metadata) in name order, fetched a page at a time"""
+        async for blob in self.container_client.list_blobs(name_starts_with=folder, include=["metadata"]):
+            yield self._stored_blob(blob.name, blob)
+
+class LocalFileStorage(StorageBackend):
+    """
+    Files on local disk under LOCAL_STORAGE_PATH, for on-prem deployments and benchmarks.
+
+    Uploads are written to a temporary file and moved into place once
+    complete, so readers never see a partial file. Content type and metadata
+    live in JSON sidecars under ``.meta/``. File I/O runs on worker threads;
+    downloads are served by the API itself with HTTP Range support.
+    """
+    name = "local"
+    serves_downloads = True
+
+    def __init__(self):
+        self.root = Path(settings.LOCAL_STORAGE_PATH).resolve()
+        self.meta_root = self.root / ".meta"
+        self.tmp_root = self.root / ".tmp"
+
+    async def connect(self):
+        for directory in (self.root, self.meta_root, self.tmp_root):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    async def check(self) -> Dict[str, Any]:
+        if not os.access(self.root, os.W_OK):
+            raise RuntimeError(f"Storage path {self.root} is not writable")
+        return {"type": "Local filesystem", "path": str(self.root)}
+
+    def local_path(self, file_id: str) -> Optional[Path]:
+        path = (self.root / file_id).resolve()
+        # Reject ids that escape the storage root or point at internal files
+        if self.root not in path.parents or path.relative_to(self.root).parts[0] in (".meta", ".tmp"):
+            return None
+        return path
+
+    def _meta_path(self, file_id: str) -> Path:
+        return self.meta_root / f"{file_id}.json"
+
+    def file_url(self, file_id: str) -> str:
+        return f"/api/v1/uploads/{file_id}/download"
+
+    async def stage_stream(
+        self,
+        blocks: AsyncIterator[bytes],
+        filename: str,
+        folder: Optional[str] = None
+    ) -> StagedUpload:
+        blob_path, unique_filename = self._new_blob_path(filename, folder)
+        if self.local_path(blob_path) is None:
+            raise ValueError(f"Invalid folder '{folder}'")
+
+        tmp_path = self.tmp_root / uuid.uuid4().hex
+        size = 0
+        handle = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for block in blocks:
+                await asyncio.to_thread(handle.write, block)
+                size += len(block)
+        except BaseException:
+            handle.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        await asyncio.to_thread(handle.close)
+
+        return StagedUpload(blob_path, unique_filename, filename, folder, size, tmp_path)
+
+    async def commit_staged(
+        self,
+        staged: StagedUpload,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        path = self.local_path(staged.file_id)
+        meta_path = self._meta_path(staged.file_id)
+        blob_metadata = self._blob_metadata(staged.original_filename, content_type, metadata)
+        sidecar = json.dumps({"content_type": content_type, "metadata": blob_metadata})
+
+        def commit():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(sidecar)
+            os.replace(staged.handle, path)
+
+        await asyncio.to_thread(commit)
+        return self._upload_result(
+            staged.file_id, staged.filename, staged.original_filename, content_type,
+            staged.size, staged.folder, blob_metadata
+        )
+
+    async def discard_staged(self, staged: StagedUpload):
+        await asyncio.to_thread(staged.handle.unlink, missing_ok=True)
+
+    async def read_file(self, file_id: str, max_size: int) -> Optional[bytes]:
+        path = self.local_path(file_id)
+        if path is None:
+            return None
+
+        def read() -> Optional[bytes]:
+            try:
+                if path.stat().st_size > max_size:
+                    return None
+                return path.read_bytes()
+            except FileNotFoundError:
+                return None
+
+        return await asyncio.to_thread(read)
+
+    async def put_file(self, file_id: str, data: bytes, content_type: str, metadata: Dict[str, str]):
+        path = self.local_path(file_id)
+        if path is None:
+            raise ValueError(f"Invalid file id '{file_id}'")
+        meta_path = self._meta_path(file_id)
+        tmp_path = self.tmp_root / uuid.uuid4().hex
+        sidecar = json.dumps({"content_type": content_type, "metadata": metadata})
+
+        def write():
+            tmp_path.write_bytes(data)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(sidecar)
+            os.replace(tmp_path, path)
+
+        await asyncio.to_thread(write)
+
+    async def delete_file(self, file_id: str) -> bool:
+        path = self.local_path(file_id)
+        if path is None:
+            return False
+
+        def delete() -> bool:
+            self._meta_path(file_id).unlink(missing_ok=True)
+            try:
+                path.unlink()
+                return True
+            except FileNotFoundError:
+                return False
+
+        return await asyncio.to_thread(delete)
+
+    def _read_blob(self, file_id: str, path: Path) -> Optional[StoredBlob]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        try:
+            sidecar = json.loads(self._meta_path(file_id).read_text())
+        except (FileNotFoundError, ValueError):
+            sidecar = {}
+        modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        return StoredBlob(
+            name=file_id,
+            size=stat.st_size,
+            content_type=sidecar.get("content_type"),
+            metadata=sidecar.get("metadata", {}),
+            created_at=modified,
+            last_modified=modified
+        )
+
+    async def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
+        path = self.local_path(file_id)
+        if path is None:
+            return None
+        blob = await asyncio.to_thread(self._read_blob, file_id, path)
+        return self._file_info(blob) if blob else None
+
+    async def iter_blobs(self, folder: Optional[str] = None):
+        """Every file in name order, listing one directory at a time"""
+        prefix = folder or ""
+
+        def list_directory(relative: str) -> List[Tuple[str, bool]]:
+            # (name, is_directory), sorted the way full names sort: directory
+            # "a" as "a/", so "a.txt" comes before everything under "a/"
+            entries = []
+            try:
+                with os.scandir(self.root / relative) as iterator:
+                    for entry in iterator:
+                        is_directory = entry.is_dir(follow_symlinks=False)
+                        if not relative and is_directory and entry.name in (".meta", ".tmp"):
+                            continue
+                        name = relative + entry.name + ("/" if is_directory else "")
+                        if name.startswith(prefix) or (is_directory and prefix.startswith(name)):
+                            entries.append((name, is_directory))
+            except FileNotFoundError:
+                pass  # Removed while we walked
+            return sorted(entries)
+
+        pending = [iter(await asyncio.to_thread(list_directory, ""))]
+        while pending:
+            name, is_directory = next(pending[-1], (None, False))
+            if name is None:
+                pending.pop()
+            elif is_directory:
+                pending.append(iter(await asyncio.to_thread(list_directory, name)))
+            else:
+                blob = await asyncio.to_thread(self._read_blob, name, self.root / name)
+                if blob is not None:
+                    yield blob
+
+STORAGE_BACKENDS = {
+    backend.name: backend
+    for backend in (AzureBlobStorage, LocalFileStorage)
+}
+
+def get_storage_backend(name: str) -> StorageBackend:
+    try:
+        return STORAGE_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown storage backend '{name}'. Choose one of: {', '.join(STORAGE_BACKENDS)}")
+
+# Create a singleton instance; clients are opened by connect() at startup
+storage = get_storage_backend(settings.STORAGE_BACKEND)
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from app.core.config import settings
+from app.db.session import get_collection
+
+logger = logging.getLogger(__name__)
+
+def hash_token(token: str) -> str:
+    """Tokens are stored and looked up by SHA-256, never as the raw JWT"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+class BloomFilter:
+    """Fixed-size Bloom filter over hex SHA-256 digests"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: str):
+        # Double hashing on two 64-bit slices of the (already uniform) digest
+        h1 = int(digest[:16], 16)
+        h2 = int(digest[16:32], 16) | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, digest: str):
+        if digest in self:
+            return
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+class TokenRevocationStore:
+    """
+    Revoked access tokens, persisted in a Mongo TTL collection.
+
+    Entries expire at the token's own ``exp``. An in-memory Bloom filter
+    answers the common "not revoked" case without a database round trip;
+    only filter hits are confirmed against Mongo. Each worker pulls entries
+    revoked elsewhere every ``sync_interval`` seconds and rebuilds its filter
+    every ``rebuild_interval`` seconds to shed expired tokens.
+    """
+
+    collection_name = "revoked_tokens"
+
+    def __init__(self, capacity: int, sync_interval: float, rebuild_interval: float):
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.bloom = BloomFilter(capacity)
+        self.ready = False
+        self._last_sync: Optional[datetime] = None
+        self._last_rebuild = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def revoke(self, token: str, expires_at: datetime):
+        digest = hash_token(token)
+        await self.collection.update_one(
+            {"_id": digest},
+            {"$setOnInsert": {"expires_at": expires_at, "revoked_at": datetime.utcnow()}},
+            upsert=True
+        )
+        self.bloom.add(digest)
+
+    async def is_revoked(self, token: str) -> bool:
+        digest = hash_token(token)
+        if self.ready and digest not in self.bloom:
+            return False
+        entry = await self.collection.find_one(
+            {"_id": digest, "expires_at": {"$gt": datetime.utcnow()}},
+            {"_id": 1}
+        )
+        return entry is not None
+
+    async def rebuild(self):
+        """Reload the Bloom filter from every unexpired revocation"""
+        started = datetime.utcnow()
+        query = {"expires_at": {"$gt": started}}
+        count = await self.collection.count_documents(query)
+        bloom = BloomFilter(max(self.capacity, count * 2))
+        async for entry in self.collection.find(query, {"_id": 1}):
+            bloom.add(entry["_id"])
+
+        self.bloom = bloom
+        self._last_sync = started
+        self._last_rebuild = time.monotonic()
+        self.ready = True
+
+    async def sync(self):
+        """Add tokens revoked by other workers since the last sync"""
+        if self._last_sync is None or time.monotonic() - self._last_rebuild >= self.rebuild_interval:
+            await self.rebuild()
+            return
+
+        started = datetime.utcnow()
+        # Overlap one interval to tolerate clock skew between workers
+        since = self._last_sync - timedelta(seconds=self.sync_interval)
+        query = {"revoked_at": {"$gte": since}}
+        async for entry in self.collection.find(query, {"_id": 1}):
+            self.bloom.add(entry["_id"])
+        self._last_sync = started
+
+        if self.bloom.count > self.bloom.capacity:
+            await self.rebuild()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Failed to sync revoked tokens: {str(e)}")
+
+    async def start(self):
+        try:
+            await self.rebuild()
+        except Exception as e:
+            # Until the filter loads, every check goes to the database
+            logger.error(f"Failed to load revoked tokens: {str(e)}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Create a singleton instance
+revocation_store = TokenRevocationStore(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+    rebuild_interval=settings.TOKEN_REVOCATION_REBUILD_INTERVAL,
+)
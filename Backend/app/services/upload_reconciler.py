@@ -0,0 +1,98 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.utils import naive_utc, next_or_none
+from app.crud.crud_file_object import file_object as crud_file_object
+from app.crud.crud_upload import upload as crud_upload
+from app.crud.crud_user import user as crud_user
+from app.models.upload import UploadCreate
+from app.services.storage import storage
+
+logger = logging.getLogger(__name__)
+
+def _record_from_blob(blob, digest: Optional[str]) -> UploadCreate:
+    metadata = dict(blob.metadata)
+    folder = os.path.dirname(blob.name)
+    return UploadCreate(
+        file_id=blob.name,
+        filename=os.path.basename(blob.name),
+        original_filename=metadata.get("original_filename", ""),
+        content_type=blob.content_type or "application/octet-stream",
+        size=blob.size,
+        folder=folder or None,
+        metadata=metadata,
+        sha256=digest,
+        created_at=naive_utc(blob.created_at),
+    )
+
+async def _adopt(blob, owner: str) -> bool:
+    """Record an unrecorded blob for its uploader, unless a record appeared meanwhile"""
+    # The record takes a reference like any upload, if the blob is indexed
+    digest = await crud_file_object.acquire_file(blob.name)
+    if await crud_upload.adopt(_record_from_blob(blob, digest), owner):
+        return True
+    if digest:
+        await crud_file_object.release(digest)
+    return False
+
+async def reconcile_uploads(dry_run: bool = False) -> Dict[str, int]:
+    """
+    Repair drift between the uploads collection and the storage backend.
+
+    Both sides are streamed in file_id order and merge-joined, so memory use
+    stays constant however many blobs there are. Blobs with no record get
+    one if their uploader still exists, records with no blob are removed,
+    and size or content type mismatches are corrected from the blob.
+    Deduplicated blobs match several records in a row; image derivatives
+    need no record of their own. Records created after the run started are
+    left alone, since their blob may not have been listed yet, and so are
+    blobs written within BLOB_GC_GRACE_PERIOD: uploads write the blob
+    before the record, and adopting one mid-upload would race with it.
+    Adoption only ever inserts, so an upload's own record is never
+    overwritten.
+    """
+    started = datetime.utcnow()
+    adopt_before = started - timedelta(seconds=settings.BLOB_GC_GRACE_PERIOD)
+    report = {"blobs": 0, "records": 0, "added": 0, "recent": 0, "removed": 0, "updated": 0}
+
+    blobs = storage.iter_blobs().__aiter__()
+    records = crud_upload.iter_sorted().__aiter__()
+    blob, record = await next_or_none(blobs), await next_or_none(records)
+    blob_matched = False
+
+    while blob is not None or record is not None:
+        if record is None or (blob is not None and blob.name < record["file_id"]):
+            report["blobs"] += 1
+            # Image derivatives are recorded on their original's records, and
+            # blobs nobody living uploaded are left to collect_garbage
+            owner = blob.metadata.get("uploaded_by")
+            if not blob_matched and "derivative_of" not in blob.metadata and owner:
+                if naive_utc(blob.last_modified or blob.created_at) > adopt_before:
+                    report["recent"] += 1
+                elif await crud_user.exists(owner) and (dry_run or await _adopt(blob, owner)):
+                    report["added"] += 1
+            blob, blob_matched = await next_or_none(blobs), False
+            continue
+
+        report["records"] += 1
+        if blob is None or record["file_id"] < blob.name:
+            if record.get("created_at", started) < started:
+                report["removed"] += 1
+                if not dry_run:
+                    await crud_upload.delete_record(record["_id"])
+                    await crud_file_object.forget(record["file_id"])
+            record = await next_or_none(records)
+            continue
+
+        blob_matched = True
+        content_type = blob.content_type or "application/octet-stream"
+        if record.get("size") != blob.size or record.get("content_type") != content_type:
+            report["updated"] += 1
+            if not dry_run:
+                await crud_upload.update(record["file_id"], {"size": blob.size, "content_type": content_type})
+        record = await next_or_none(records)
+
+    logger.info(f"Upload reconciliation{' (dry run)' if dry_run else ''}: {report}")
+    return report
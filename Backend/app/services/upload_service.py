@@ -0,0 +1,149 @@
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+from app.crud.crud_file_object import file_object as crud_file_object
+from app.crud.crud_upload import upload as crud_upload
+from app.models.upload import UploadCreate, UploadInDB
+from app.services.storage import StagedUpload, storage
+
+logger = logging.getLogger(__name__)
+
+async def store_upload(
+    staged: StagedUpload,
+    digest: str,
+    content_type: str,
+    user_id: str,
+    metadata: Dict[str, str]
+) -> Tuple[UploadInDB, bool]:
+    """
+    Publish a staged upload, deduplicating by content digest.
+
+    If the same bytes are already stored, the staged blocks are discarded
+    instead of committed and the new record points at the existing file, so
+    storage keeps one copy. The bytes were still sent to storage while
+    staging, because the digest is only known once the last block is read;
+    uploads that declare their digest up front skip that through
+    ``store_duplicate``. Returns the upload record and whether it was
+    deduplicated.
+    """
+    # The same user uploading the same bytes again gets their existing record
+    existing = await crud_upload.get_by_digest(user_id, digest)
+    if existing:
+        await storage.discard_staged(staged)
+        return existing, True
+
+    derivatives = {}
+    stored = await crud_file_object.acquire(digest)
+    if stored is not None:
+        await storage.discard_staged(staged)
+        file_id, metadata = stored["file_id"], {**metadata, "original_filename": staged.original_filename}
+        derivatives = await _shared_derivatives(file_id)
+    else:
+        result = await storage.commit_staged(staged, content_type, metadata)
+        file_id, metadata = staged.file_id, result["metadata"]
+        if not await crud_file_object.register(digest, file_id, staged.size, content_type):
+            # An identical upload registered first; share its file instead
+            stored = await crud_file_object.acquire(digest)
+            if stored is not None:
+                await storage.delete_file(file_id)
+                file_id = stored["file_id"]
+            else:
+                # It is being deleted right now; keep ours unindexed
+                digest = None
+
+    upload = await _create_record(
+        UploadCreate(
+            file_id=file_id,
+            filename=os.path.basename(file_id),
+            original_filename=staged.original_filename,
+            content_type=content_type,
+            size=staged.size,
+            folder=staged.folder,
+            metadata=metadata,
+            sha256=digest,
+            derivatives=derivatives
+        ),
+        user_id
+    )
+    return upload, stored is not None
+
+async def store_duplicate(
+    digest: str,
+    original_filename: str,
+    size: int,
+    folder: Optional[str],
+    content_type: str,
+    user_id: str,
+    metadata: Dict[str, str]
+) -> Optional[UploadInDB]:
+    """
+    Record an upload whose bytes are already stored, without staging them.
+
+    For uploads that declared their digest: the caller checked ``is_stored``
+    first, then hashed the body without writing it anywhere and verified it
+    against the declared digest. Returns None if the stored copy was deleted
+    in the meantime.
+    """
+    existing = await crud_upload.get_by_digest(user_id, digest)
+    if existing:
+        return existing
+
+    stored = await crud_file_object.acquire(digest)
+    if stored is None:
+        return None
+    file_id = stored["file_id"]
+    return await _create_record(
+        UploadCreate(
+            file_id=file_id,
+            filename=os.path.basename(file_id),
+            original_filename=original_filename,
+            content_type=content_type,
+            size=size,
+            folder=folder,
+            metadata={**metadata, "original_filename": original_filename},
+            sha256=digest,
+            derivatives=await _shared_derivatives(file_id)
+        ),
+        user_id
+    )
+
+async def is_stored(digest: str) -> bool:
+    """Whether a live stored copy of ``digest`` exists"""
+    return await crud_file_object.exists(digest)
+
+async def _shared_derivatives(file_id: str) -> Dict[str, Any]:
+    # Share any thumbnails already generated for the file
+    sibling = await crud_upload.get_by_file_id(file_id)
+    return sibling.derivatives if sibling else {}
+
+async def _create_record(upload_in: UploadCreate, user_id: str) -> UploadInDB:
+    """Write the upload record for a file this upload holds a reference to"""
+    try:
+        upload, created = await crud_upload.upsert(upload_in, user_id=user_id)
+    except Exception:
+        await release_file(upload_in.file_id, upload_in.sha256)
+        raise
+    if not created:
+        # A concurrent identical upload by the same user wrote the record
+        # first and holds its own reference; drop ours
+        await release_file(upload_in.file_id, upload_in.sha256)
+    return upload
+
+async def release_file(file_id: str, digest: Optional[str], derivative_ids: Iterable[str] = ()):
+    """Drop one reference to a stored file and delete it (and its derivatives) once nothing uses it"""
+    if digest:
+        orphan = await crud_file_object.release(digest)
+    else:
+        orphan = file_id if await crud_upload.count_references(file_id) == 0 else None
+
+    if orphan:
+        await storage.delete_file(orphan)
+        for derivative_id in derivative_ids:
+            await storage.delete_file(derivative_id)
+        logger.info(f"Deleted stored file {orphan}; no uploads reference it")
+
+async def delete_upload(upload: UploadInDB):
+    """Delete one upload record and, if it was the last reference, the stored file"""
+    if await crud_upload.delete_record(upload.id):
+        derivative_ids = [derivative.file_id for derivative in upload.derivatives.values()]
+        await release_file(upload.file_id, upload.sha256, derivative_ids)
@@ -0,0 +1,137 @@
+from typing import AsyncIterator, Dict, Optional
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+
+class MultipartFileStream:
+    """
+    Streams the first file part of a ``multipart/form-data`` request body.
+
+    The body is fed to python-multipart's push parser as it arrives and file
+    bytes are re-chunked into ``block_size`` blocks, so memory use is bounded
+    by one block plus one network chunk regardless of file size. The size
+    limit is enforced while reading, before the rest of the body is consumed.
+    """
+
+    def __init__(self, request: Request, block_size: int, max_size: int):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a multipart/form-data body with a file part"
+            )
+
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_size + 64 * 1024:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Maximum size is {max_size} bytes"
+            )
+
+        self.block_size = block_size
+        self.max_size = max_size
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+
+        self._body = request.stream().__aiter__()
+        self._buffer = bytearray()
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._in_file = False
+        self._file_started = False
+        self._file_done = False
+        self._body_done = False
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    # Parser callbacks
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[bytes(self._header_field).lower()] = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"filename" in options and not self._file_started:
+            self._in_file = self._file_started = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self.content_type = self._headers.get(b"content-type", b"").decode("latin-1") or None
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._buffer += data[start:end]
+            self.size += end - start
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
+
+    async def _pump(self) -> bool:
+        """Feed the next network chunk to the parser; False once the body is exhausted"""
+        if self._body_done:
+            return False
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            self._body_done = True
+            self._parser.finalize()
+            return False
+        if chunk:
+            self._parser.write(chunk)
+        if self.size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Maximum size is {self.max_size} bytes"
+            )
+        return True
+
+    async def start(self):
+        """Read up to the file part's headers so filename and content type are known"""
+        while not self._file_started and await self._pump():
+            pass
+        if not self._file_started:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No file part found in the request"
+            )
+
+    async def peek(self, size: int) -> bytes:
+        """Return up to ``size`` leading file bytes without consuming them"""
+        while len(self._buffer) < size and not self._file_done and await self._pump():
+            pass
+        return bytes(self._buffer[:size])
+
+    async def blocks(self) -> AsyncIterator[bytes]:
+        """Yield the file's bytes in ``block_size`` blocks (the last may be shorter)"""
+        while True:
+            while len(self._buffer) >= self.block_size:
+                # Copy straight out of the buffer rather than via a slice
+                with memoryview(self._buffer) as view:
+                    block = bytes(view[:self.block_size])
+                del self._buffer[:self.block_size]
+                yield block
+            if self._file_done or not await self._pump():
+                break
+        if self._buffer:
+            block = bytes(self._buffer)
+            self._buffer.clear()
+            yield block
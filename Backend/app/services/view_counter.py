@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.db.session import get_collection
+
+logger = logging.getLogger(__name__)
+
+class ViewCountBuffer:
+    """
+    In-process accumulator for question view counts.
+
+    Page views only bump an in-memory counter; pending deltas are written
+    with a single ``bulk_write`` every ``flush_interval`` seconds, as soon as
+    ``max_pending`` distinct questions are waiting, and on shutdown. The
+    early flush runs as a background task, so the view that fills the buffer
+    doesn't wait for the write either.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[ObjectId, int] = defaultdict(int)
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # Stats
+        self.views_recorded = 0
+        self.writes_issued = 0
+        # Per-view updates that did not need their own write, counted as views
+        # land on a question that already has a pending delta
+        self.updates_merged = 0
+        self.flushes = 0
+
+    @property
+    def pending_views(self) -> int:
+        return sum(self._pending.values())
+
+    async def increment(self, question_id: str) -> bool:
+        if not ObjectId.is_valid(question_id):
+            return False
+
+        object_id = ObjectId(question_id)
+        if object_id in self._pending:
+            self.updates_merged += 1
+        self._pending[object_id] += 1
+        self.views_recorded += 1
+
+        if len(self._pending) >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+        return True
+
+    async def flush(self) -> int:
+        """Write all pending deltas; returns the number of questions updated"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            # Swap the buffer before awaiting so new views land in a fresh one
+            pending, self._pending = self._pending, defaultdict(int)
+            operations = [
+                UpdateOne({"_id": question_id}, {"$inc": {"views": delta}})
+                for question_id, delta in pending.items()
+            ]
+
+            try:
+                await get_collection("questions").bulk_write(operations, ordered=False)
+            except Exception as e:
+                # Put the deltas back so the next flush retries them
+                for question_id, delta in pending.items():
+                    if question_id in self._pending:
+                        self.updates_merged += 1
+                    self._pending[question_id] += delta
+                logger.error(f"Failed to flush view counts: {str(e)}")
+                return 0
+
+            self.writes_issued += len(operations)
+            self.flushes += 1
+            return len(operations)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "views_recorded": self.views_recorded,
+            "writes_issued": self.writes_issued,
+            "updates_merged": self.updates_merged,
+            "pending_questions": len(self._pending),
+            "flushes": self.flushes,
+        }
+
+# Create a singleton instance
+view_counter = ViewCountBuffer(
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL,
+    max_pending=settings.VIEW_COUNT_MAX_PENDING,
+)
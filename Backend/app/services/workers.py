@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ProcessPool:
+    """
+    Process pool for CPU-bound work.
+
+    Created on first use and shut down from the app lifespan. Functions
+    submitted here must be importable at module level so they can be
+    pickled to the workers. Request-path work (content sniffing) and
+    background work (image derivatives) get separate pools, so a backlog of
+    renders never queues ahead of an upload waiting on its sniff.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def shutdown(self):
+        """Cancel queued work and wait for running tasks, off the event loop"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+# Create the singleton instances
+process_pool = ProcessPool(max_workers=settings.WORKER_PROCESSES)
+derivative_pool = ProcessPool(max_workers=settings.DERIVATIVE_PROCESSES)
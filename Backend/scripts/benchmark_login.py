@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark bcrypt verification inline on the event loop vs. on the password pool.
+
+A burst of concurrent "logins" runs while a probe coroutine stands in for
+other endpoints, waking every few milliseconds and recording how late it
+was scheduled. Inline hashing stalls the whole loop, so the probe's p99
+lateness jumps to roughly one bcrypt round per queued login.
+
+Usage:
+    python scripts/benchmark_login.py [--logins 40] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+async def probe(stop: asyncio.Event, samples: list, interval: float = 0.005):
+    """
+    Stand-in for a cheap endpoint: measures scheduling delay on the loop.
+
+    A stall of ``d`` seconds delays every request that would have arrived
+    during it, so it contributes one sample per missed tick.
+    """
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        late = time.perf_counter() - expected
+        samples.append(max(0.0, late))
+        while late > interval:
+            late -= interval
+            samples.append(late)
+
+async def run(mode: str, logins: int, workers: int, hashed: str) -> dict:
+    executor = ThreadPoolExecutor(max_workers=workers)
+    loop = asyncio.get_running_loop()
+
+    async def login():
+        if mode == "inline":
+            return pwd_context.verify("password123", hashed)
+        return await loop.run_in_executor(executor, pwd_context.verify, "password123", hashed)
+
+    stop, samples = asyncio.Event(), []
+    probe_task = asyncio.create_task(probe(stop, samples))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+    executor.shutdown()
+
+    samples.sort()
+    return {
+        "logins_per_s": logins / elapsed,
+        "probe_p50_ms": statistics.median(samples) * 1000,
+        "probe_p99_ms": samples[int(len(samples) * 0.99) - 1] * 1000,
+        "probe_max_ms": samples[-1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40, help="Concurrent login attempts")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PASSWORD_HASH_WORKERS", 4)), help="Password pool size")
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash("password123")
+    print(f"{'mode':>8} {'logins/s':>9} {'probe p50 ms':>13} {'probe p99 ms':>13} {'probe max ms':>13}")
+    for mode in ("inline", "pool"):
+        result = asyncio.run(run(mode, args.logins, args.workers, hashed))
+        print(
+            f"{mode:>8} {result['logins_per_s']:>9.1f} {result['probe_p50_ms']:>13.2f} "
+            f"{result['probe_p99_ms']:>13.2f} {result['probe_max_ms']:>13.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark building read models from stored documents, per page size.
+
+Compares the ways a CRUD reader can turn a page of Mongo documents into
+models: validating each row (``Model(**doc)``, what the readers used to
+do), skipping validation with ``model_construct``, and validating the whole
+page in one ``TypeAdapter`` call (``many_from_db`` in app/crud/readers.py,
+what they do now). The notification case also times the old path, which
+stringified every id by hand before validating it back into an ObjectId.
+Documents are synthetic but shaped like what the app stores, so no database
+is needed.
+
+Usage:
+    python scripts/benchmark_model_reads.py [--sizes 20,100,1000] [--seconds 0.5]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from bson import ObjectId
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.crud.readers import many_from_db
+from app.models.answer import AnswerInDB
+from app.models.notification import NotificationInDB
+from app.models.question import QuestionInDB, QuestionSummary
+
+def make_question(rng: random.Random) -> dict:
+    created = datetime.utcnow() - timedelta(minutes=rng.randint(0, 100000))
+    return {
+        "_id": ObjectId(), "title": "How do I benchmark model construction?",
+        "content": "Lorem ipsum dolor sit amet " * rng.randint(5, 80),
+        "excerpt": "Lorem ipsum dolor sit amet " * 7, "tags": rng.sample(["python", "mongodb", "fastapi", "pydantic"], 2),
+        "is_answered": rng.random() < 0.5, "views": rng.randint(0, 5000), "votes": rng.randint(-5, 50),
+        "status": "approved", "author_id": ObjectId(), "author_name": "Ada Lovelace",
+        "answer_count": rng.randint(0, 10), "accepted_answer_id": None, "created_at": created, "updated_at": created
+    }
+
+def make_answer(rng: random.Random) -> dict:
+    created = datetime.utcnow() - timedelta(minutes=rng.randint(0, 100000))
+    return {
+        "_id": ObjectId(), "question_id": ObjectId(), "author_id": ObjectId(), "author_name": "Grace Hopper",
+        "content": "Measure before optimizing. " * rng.randint(2, 30), "votes": rng.randint(-5, 50),
+        "is_accepted": False, "status": "approved", "created_at": created, "updated_at": created
+    }
+
+def make_notification(rng: random.Random) -> dict:
+    return {
+        "_id": ObjectId(), "user_id": ObjectId(), "type": "answer", "title": "New answer",
+        "message": "Someone answered your question", "is_read": rng.random() < 0.5,
+        "related_question_id": ObjectId(), "related_answer_id": ObjectId(),
+        "created_at": datetime.utcnow() - timedelta(minutes=rng.randint(0, 100000))
+    }
+
+def summary_of(document: dict) -> dict:
+    return {key: value for key, value in document.items() if key not in ("content", "accepted_answer_id")}
+
+def stringify_ids(document: dict) -> dict:
+    # What CRUDNotification did per row before many_from_db
+    for key in ("_id", "user_id", "related_question_id", "related_answer_id"):
+        if key in document:
+            document[key] = str(document[key])
+    return document
+
+def rows_per_second(build, documents: List[dict], seconds: float) -> float:
+    rows = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        build(documents)
+        rows += len(documents)
+    return rows / (time.perf_counter() - start)
+
+def main(sizes: List[int], seconds: float):
+    rng = random.Random(42)
+    cases = [
+        ("QuestionInDB", QuestionInDB, make_question),
+        ("QuestionSummary", QuestionSummary, lambda rng: summary_of(make_question(rng))),
+        ("AnswerInDB", AnswerInDB, make_answer),
+        ("NotificationInDB", NotificationInDB, make_notification),
+    ]
+
+    print(f"{'Model':<18} {'Rows':>6} {'validate/row':>14} {'construct':>14} {'many_from_db':>14} {'speedup':>8}")
+    for name, model, make in cases:
+        for size in sizes:
+            documents = [make(rng) for _ in range(size)]
+            if model is NotificationInDB:
+                validated = rows_per_second(
+                    lambda docs: [model(**stringify_ids(dict(doc))) for doc in docs], documents, seconds
+                )
+            else:
+                validated = rows_per_second(lambda docs: [model(**doc) for doc in docs], documents, seconds)
+            constructed = rows_per_second(lambda docs: [model.model_construct(**doc) for doc in docs], documents, seconds)
+            batched = rows_per_second(lambda docs: many_from_db(model, docs), documents, seconds)
+            print(
+                f"{name:<18} {size:>6} {validated:>12,.0f}/s {constructed:>12,.0f}/s {batched:>12,.0f}/s "
+                f"{batched / validated:>7.1f}x"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark building read models from stored documents")
+    parser.add_argument("--sizes", default="20,100,1000", help="Comma-separated page sizes")
+    parser.add_argument("--seconds", type=float, default=0.5, help="Time spent per measurement")
+    args = parser.parse_args()
+
+    main([int(size) for size in args.sizes.split(",")], args.seconds)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory BM25 question index against the regex search path.
+
+The regex path is reproduced in-process (a case-insensitive ``re`` scan over
+every title and content, which is what the ``$regex``/``$or`` query makes the
+server do per document), so no database is needed and both sides see the
+same synthetic corpus.
+
+Usage:
+    python scripts/benchmark_search.py [--sizes 10000,100000,1000000] [--queries 50]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from bson import ObjectId
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.inverted_index import InvertedIndex
+
+WORDS = [
+    "python", "fastapi", "mongodb", "async", "docker", "react", "azure", "index",
+    "query", "cursor", "token", "upload", "error", "timeout", "deploy", "cache",
+    "thread", "memory", "latency", "schema", "router", "request", "response",
+    "session", "database", "pipeline", "kubernetes", "nginx", "javascript", "jwt",
+]
+
+def make_vocabulary(size: int, rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    filler = {"".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)}
+    return WORDS + sorted(filler)
+
+def make_corpus(count: int, vocabulary: list, rng: random.Random):
+    # Zipf-like word choice so a few terms are common and most are rare
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    for _ in range(count):
+        title = " ".join(rng.choices(vocabulary, weights=weights, k=8))
+        content = " ".join(rng.choices(vocabulary, weights=weights, k=60))
+        yield ObjectId(), title, content
+
+def bench_regex(corpus: list, queries: list, limit: int = 20) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        pattern = re.compile(query, re.IGNORECASE)
+        matches = [doc_id for doc_id, title, content in corpus if pattern.search(title) or pattern.search(content)]
+        total = len(matches)  # the regex path scans again for count_documents
+        _ = matches[:limit], total
+    return (time.perf_counter() - start) / len(queries)
+
+def bench_index(index: InvertedIndex, queries: list, limit: int = 20) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, limit=limit)
+    return (time.perf_counter() - start) / len(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(20000, rng)
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(args.queries)]
+
+    print(f"{'questions':>10} {'build s':>9} {'index MB':>9} {'bm25 ms/q':>10} {'regex ms/q':>11} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        corpus = list(make_corpus(size, vocabulary, rng))
+
+        index = InvertedIndex()
+        start = time.perf_counter()
+        for doc_id, title, content in corpus:
+            index.add(doc_id, title, content)
+        build_seconds = time.perf_counter() - start
+
+        bm25 = bench_index(index, queries)
+        # Regex queries are single words, matching what users type into /search/
+        regex = bench_regex(corpus, [query.split()[0] for query in queries[:10]])
+        print(
+            f"{size:>10} {build_seconds:>9.2f} {index.memory_usage() / 2**20:>9.1f} "
+            f"{bm25 * 1000:>10.2f} {regex * 1000:>11.2f} {regex / bm25:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark encoding a list page into a response body, before and after orjson.
+
+"Before" is what FastAPI does with the dict an endpoint used to return:
+``jsonable_encoder`` over every nested model and ObjectId, then the stdlib
+``json`` encoder in JSONResponse. "After" is ``standard_response`` in
+app/core/responses.py, which renders the envelope with orjson in one pass.
+Pages are built from synthetic documents with the app's read models, so no
+database is needed.
+
+Usage:
+    python scripts/benchmark_serialization.py [--sizes 20,100,1000] [--seconds 0.5]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmark_model_reads import make_answer, make_notification, make_question, summary_of
+from app.core.responses import standard_response
+from app.crud.readers import many_from_db
+from app.models.answer import AnswerInDB
+from app.models.notification import NotificationInDB
+from app.models.question import QuestionInDB, QuestionSummary
+
+def envelope(items: list) -> dict:
+    return {
+        "success": True,
+        "data": {"items": items, "total": len(items), "skip": 0, "limit": len(items), "next_cursor": None},
+        "message": "Items retrieved successfully",
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+def before(items: list) -> bytes:
+    return JSONResponse(jsonable_encoder(envelope(items))).body
+
+def after(items: list) -> bytes:
+    return standard_response(True, data={
+        "items": items, "total": len(items), "skip": 0, "limit": len(items), "next_cursor": None
+    }, message="Items retrieved successfully").body
+
+def microseconds_per_page(encode, items: list, seconds: float) -> float:
+    pages = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        encode(items)
+        pages += 1
+    return (time.perf_counter() - start) / pages * 1e6
+
+def main(sizes: List[int], seconds: float):
+    rng = random.Random(42)
+    cases = [
+        ("QuestionInDB", QuestionInDB, make_question),
+        ("QuestionSummary", QuestionSummary, lambda rng: summary_of(make_question(rng))),
+        ("AnswerInDB", AnswerInDB, make_answer),
+        ("NotificationInDB", NotificationInDB, make_notification),
+    ]
+
+    print(f"{'Model':<18} {'Rows':>6} {'before':>12} {'after':>12} {'speedup':>8} {'bytes':>9}")
+    for name, model, make in cases:
+        for size in sizes:
+            items = many_from_db(model, [make(rng) for _ in range(size)])
+            old_body, new_body = before(items), after(items)
+            slow = microseconds_per_page(before, items, seconds)
+            fast = microseconds_per_page(after, items, seconds)
+            print(
+                f"{name:<18} {size:>6} {slow:>9,.0f} us {fast:>9,.0f} us {slow / fast:>7.1f}x "
+                f"{len(new_body):>9,}{'' if len(old_body) == len(new_body) else ' (size differs)'}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization per page")
+    parser.add_argument("--sizes", default="20,100,1000", help="Comma-separated page sizes")
+    parser.add_argument("--seconds", type=float, default=0.5, help="Time spent per measurement")
+    args = parser.parse_args()
+
+    main([int(size) for size in args.sizes.split(",")], args.seconds)
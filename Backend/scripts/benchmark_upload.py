@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of buffered vs. streamed multipart uploads.
+
+Each mode runs in a fresh subprocess that pushes ``--concurrency`` uploads of
+``--size-mb`` through the upload path at once, with the blob client replaced
+by a sink that drops every block. "buffered" mirrors the previous endpoint
+(spooled form file, ``await file.read()``, copy into ``BytesIO``);
+"streaming" drives ``MultipartFileStream`` into ``UPLOAD_BLOCK_SIZE`` blocks.
+The report is peak RSS above the interpreter baseline, total and per upload.
+
+Usage:
+    python scripts/benchmark_upload.py [--size-mb 50] [--concurrency 4] [--block-kb 4096]
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.upload_stream import MultipartFileStream
+
+BOUNDARY = "benchmarkboundary"
+CHUNK_SIZE = 64 * 1024
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def multipart_body(size: int):
+    """Generate a single-file multipart body in network-sized chunks"""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="data.bin"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    chunk = b"x" * CHUNK_SIZE
+    sent = 0
+    while sent < size:
+        piece = chunk[:min(CHUNK_SIZE, size - sent)]
+        sent += len(piece)
+        yield piece
+        await asyncio.sleep(0)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+class FakeRequest:
+    def __init__(self, size: int):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        self._size = size
+
+    def stream(self):
+        return multipart_body(self._size)
+
+async def buffered_upload(size: int) -> int:
+    # Starlette spools form files to a SpooledTemporaryFile (1 MB in memory)
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    async for chunk in multipart_body(size):
+        spooled.write(chunk)
+    spooled.seek(0)
+    file_content = spooled.read()
+    file_obj = BytesIO(file_content)
+    # Hold the body while it is "sent", as the upload call did
+    sent = 0
+    while True:
+        piece = file_obj.read(CHUNK_SIZE)
+        if not piece:
+            break
+        sent += len(piece)
+        await asyncio.sleep(0)
+    return sent
+
+async def streaming_upload(size: int, block_size: int) -> int:
+    file_stream = MultipartFileStream(FakeRequest(size), block_size, size + 1)
+    await file_stream.start()
+    staged = 0
+    async for block in file_stream.blocks():
+        staged += len(block)
+        await asyncio.sleep(0)
+    return staged
+
+async def run_mode(mode: str, size: int, concurrency: int, block_size: int):
+    if mode == "buffered":
+        uploads = [buffered_upload(size) for _ in range(concurrency)]
+    else:
+        uploads = [streaming_upload(size, block_size) for _ in range(concurrency)]
+    results = await asyncio.gather(*uploads)
+    # The multipart framing is included in the buffered count
+    assert all(result >= size for result in results)
+
+def child(mode: str, size: int, concurrency: int, block_size: int):
+    baseline = peak_rss_mb()
+    asyncio.run(run_mode(mode, size, concurrency, block_size))
+    peak = peak_rss_mb() - baseline
+    print(json.dumps({"mode": mode, "peak_mb": peak, "per_upload_mb": peak / concurrency}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upload memory use")
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--block-kb", type=int, default=4096)
+    parser.add_argument("--child", choices=["buffered", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    block_size = args.block_kb * 1024
+    if args.child:
+        child(args.child, size, args.concurrency, block_size)
+        return
+
+    print(f"{args.concurrency} concurrent uploads of {args.size_mb} MB, {args.block_kb} KB blocks")
+    print(f"{'mode':<10} {'peak RSS':>12} {'per upload':>12}")
+    for mode in ("buffered", "streaming"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode,
+             "--size-mb", str(args.size_mb),
+             "--concurrency", str(args.concurrency),
+             "--block-kb", str(args.block_kb)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<10} {result['peak_mb']:>9.1f} MB {result['per_upload_mb']:>9.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Count the MongoDB commands each API endpoint sends, and fail on regressions.
+
+Runs a fixed scenario (ask, edit, answer, accept, read notifications, ...)
+in-process against a scratch database, with a pymongo command listener
+counting every command per request. Each endpoint has a budget
+of round trips; the script exits non-zero if any endpoint exceeds it, so it
+can run in CI next to a disposable MongoDB. Authentication is warmed up
+first, so budgets cover the endpoint's own queries only.
+
+Command counts don't show a query that scans: every limited ``find`` is
+also re-run through ``explain`` and fails the check if it examined more
+documents than its page can need. The scratch database gets the app's
+indexes and enough filler documents that a scan would stand out. Requests
+whose total is cached or not asked for must not count at all.
+
+Needs a reachable MONGODB_URL and httpx. The scratch database
+(<DATABASE_NAME>_round_trips) is dropped afterwards.
+
+Usage:
+    python scripts/check_db_round_trips.py [--verbose]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+from pymongo import monitoring
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.indexes import ensure_indexes
+from app.db.monitoring import CommandCounter
+
+# Listeners must be registered before the client is created
+counter = CommandCounter()
+monitoring.register(counter)
+
+# Endpoint -> maximum commands per request
+BUDGETS = {
+    "PUT /users/me": 1,                # findAndModify
+    "POST /questions/": 2,             # insert, one tag counter
+    "PUT /questions/{id}": 2,          # ownership read, findAndModify
+    "GET /questions/{id}": 2,          # question, answers (views are buffered)
+    "POST /answers/{id}/answers": 4,   # question, insert, answer count, notification
+    "PATCH /answers/{id}/accept": 5,   # answer, question, accept, mark answered, notification
+    "GET /questions/": 2,              # page, estimated total (cached after the first call)
+    "GET /questions/?cursor": 1,       # page (total cached)
+    "GET /answers/{id}/answers": 3,    # question, page, total
+    "GET /answers/{id}/answers?include_total=false": 2,  # question, page
+    "GET /notifications/": 2,          # page; total and unread count in one $facet of $counts
+    "PATCH /notifications/{id}/mark-as-read": 2,  # ownership read, update
+}
+
+# Requests that must not send a counting command (count_documents is an aggregate)
+COUNT_FREE = {"GET /questions/?cursor", "GET /answers/{id}/answers?include_total=false"}
+COUNT_COMMANDS = {"aggregate", "count"}
+
+# Filler documents per list, comfortably more than a default page (20)
+FILLER = 60
+
+# Documents a limited find may examine per document it returns. A cursor
+# seek is an $or of two index ranges, and both may be fetched from.
+EXAMINED_PER_LIMIT = 2
+
+async def docs_examined(database, command: dict) -> int:
+    """totalDocsExamined for a recorded find command, from explain"""
+    find = {"find": command["find"]}
+    find.update({key: command[key] for key in ("filter", "sort", "projection", "skip", "limit") if key in command})
+    plan = await database.command("explain", find, verbosity="executionStats")
+    return plan["executionStats"]["totalDocsExamined"]
+
+async def main(verbose: bool = False) -> int:
+    import httpx
+    from app.core.config import settings
+    settings.DATABASE_NAME = f"{settings.DATABASE_NAME}_round_trips"
+
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.crud.crud_user import user as crud_user
+    from app.db.session import Database
+    from app.models.user import UserCreate
+    from app.services.token_revocation import revocation_store
+
+    await Database.connect_to_mongo()
+    await ensure_indexes(Database.db)
+    await revocation_store.start()
+    results = []
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+
+            async def call(name: str, method: str, path: str, token: str = None, **kwargs):
+                headers = {"Authorization": f"Bearer {token}"} if token else {}
+                counter.reset()
+                response = await client.request(method, path, headers=headers, **kwargs)
+                commands = counter.snapshot()
+                # Monitoring commands (hello, ping) aren't round trips for the request
+                commands.pop("hello", None)
+                commands.pop("ismaster", None)
+                finds = counter.finds()
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{name} failed with {response.status_code}: {response.text}")
+                # Explain after the request, so explains aren't counted against it
+                scans = []  # query plan problems: scans, counts that should not run
+                for database, command in finds:
+                    limit = abs(command.get("limit", 0))
+                    if not limit:
+                        continue
+                    examined = await docs_examined(Database.client[database], command)
+                    if examined > limit * EXAMINED_PER_LIMIT:
+                        scans.append(f"{command['find']}: {examined} docs examined for limit {limit}")
+                if name in COUNT_FREE:
+                    scans.extend(f"sent {command} with no total to compute" for command in COUNT_COMMANDS & set(commands))
+                results.append((name, sum(commands.values()), commands, scans))
+                return response.json()["data"]
+
+            async def register(email: str):
+                user = await crud_user.create(UserCreate(
+                    email=email, password="Password123!", first_name="Round", last_name="Trip"
+                ))
+                token = create_access_token({"sub": str(user.id), "role": user.role, "version": 0})
+                # Warm the principal cache so budgets exclude authentication
+                await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+                return token, str(user.id)
+
+            asker, _ = await register("asker@example.com")
+            answerer, answerer_id = await register("answerer@example.com")
+
+            question = await call("POST /questions/", "POST", "/questions/", asker, json={
+                "title": "How do I count round trips?", "content": "Each request should use as few commands as possible.",
+                "tags": ["mongodb"]
+            })
+            question_id = question["_id"] if "_id" in question else question["id"]
+            await call("PUT /questions/{id}", "PUT", f"/questions/{question_id}", asker, json={"tags": ["mongodb"]})
+            await call("GET /questions/{id}", "GET", f"/questions/{question_id}", answerer)
+            answer = await call("POST /answers/{id}/answers", "POST", f"/answers/{question_id}/answers", answerer, json={
+                "content": "Use a command listener and count started events."
+            })
+            answer_id = answer["_id"] if "_id" in answer else answer["id"]
+
+            # Filler, so that a list query which scans examines far more than a page
+            now = datetime.utcnow()
+            db = Database.db
+            text = "Filler text so the list has more than one page."
+            await db.questions.insert_many([{
+                "title": f"Filler question {i}", "content": text, "excerpt": text, "tags": ["mongodb"],
+                "status": "approved", "votes": 0, "views": 0, "answer_count": 0, "is_answered": False,
+                "author_id": ObjectId(), "author_name": "Filler", "created_at": now - timedelta(minutes=i),
+                "updated_at": now - timedelta(minutes=i)
+            } for i in range(1, FILLER + 1)])
+            await db.answers.insert_many([{
+                "question_id": ObjectId(question_id), "content": text, "votes": -1, "is_accepted": False,
+                "status": "approved", "author_id": ObjectId(), "author_name": "Filler",
+                "created_at": now, "updated_at": now
+            } for _ in range(FILLER)])
+            await db.notifications.insert_many([{
+                "user_id": ObjectId(answerer_id), "type": "answer", "title": "Filler", "message": text,
+                "is_read": True, "created_at": now - timedelta(days=1, minutes=i)
+            } for i in range(FILLER)])
+
+            questions = await call("GET /questions/", "GET", "/questions/", answerer)
+            await call(
+                "GET /questions/?cursor", "GET", "/questions/", answerer,
+                params={"cursor": questions["next_cursor"]}
+            )
+            await call("GET /answers/{id}/answers", "GET", f"/answers/{question_id}/answers", answerer)
+            await call(
+                "GET /answers/{id}/answers?include_total=false", "GET", f"/answers/{question_id}/answers", answerer,
+                params={"include_total": "false"}
+            )
+            await call("PATCH /answers/{id}/accept", "PATCH", f"/answers/{answer_id}/accept", asker)
+            notifications = await call("GET /notifications/", "GET", "/notifications/", answerer)
+            notification = notifications["items"][0]
+            notification_id = notification["_id"] if "_id" in notification else notification["id"]
+            await call(
+                "PATCH /notifications/{id}/mark-as-read", "PATCH",
+                f"/notifications/{notification_id}/mark-as-read", answerer
+            )
+            # Last: it invalidates the caller's cached principal
+            await call("PUT /users/me", "PUT", "/users/me", asker, json={"first_name": "Asker"})
+    finally:
+        await revocation_store.stop()
+        await Database.client.drop_database(settings.DATABASE_NAME)
+        await Database.close_mongo_connection()
+
+    failures = 0
+    print(f"{'Endpoint':<48} {'Commands':>8} {'Budget':>6}")
+    for name, total, commands, scans in results:
+        budget = BUDGETS[name]
+        over = total > budget
+        failures += over or bool(scans)
+        print(f"{name:<48} {total:>8} {budget:>6}{'  OVER BUDGET' if over else ''}{'  QUERY PLAN' if scans else ''}")
+        if verbose or over:
+            print(f"    {commands}")
+        for scan in scans:
+            print(f"    {scan}")
+
+    if failures:
+        print(f"{failures} request(s) exceeded their round-trip budget or scanned")
+        return 1
+    print("All endpoints within budget")
+    return 0
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Check MongoDB round trips per endpoint")
+    parser.add_argument("--verbose", action="store_true", help="Show the commands behind each count")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(verbose=args.verbose)))
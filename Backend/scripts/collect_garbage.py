@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script to delete stored files that no upload record references.
+
+Removes upload records left behind by deleted users, then deletes blobs
+with no record once they are older than the grace period
+(BLOB_GC_GRACE_PERIOD). Run with --dry-run first to see what would go.
+
+Usage:
+    python scripts/collect_garbage.py [--dry-run] [--grace-hours HOURS]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import Database
+from app.services.storage import storage
+from app.services.blob_gc import collect_garbage
+
+async def main(dry_run: bool = False, grace_hours: float = None):
+    """
+    Main function to run the script
+    """
+    # Initialize database and storage connections
+    await Database.connect_to_mongo()
+    await storage.connect()
+
+    grace_period = timedelta(hours=grace_hours) if grace_hours is not None else None
+    try:
+        report = await collect_garbage(dry_run=dry_run, grace_period=grace_period)
+    except Exception as e:
+        print(f"Error collecting garbage: {str(e)}")
+        sys.exit(1)
+    finally:
+        await storage.close()
+        await Database.close_mongo_connection()
+
+    print(f"Upload records of deleted users: {report['orphaned_records']}")
+    print(f"Blobs scanned: {report['blobs']}, referenced: {report['referenced']}, "
+          f"within grace period: {report['recent']}, awaiting reconciliation: {report['unrecorded']}")
+    print(f"Unreferenced blobs {'to delete' if dry_run else 'deleted'}: {report['deleted']} ({report['deleted_bytes']} bytes)")
+    for name in report["examples"]:
+        print(f"  {name}")
+    if report["deleted"] > len(report["examples"]):
+        print(f"  ... and {report['deleted'] - len(report['examples'])} more")
+    if dry_run:
+        print("Dry run: nothing was deleted")
+    sys.exit(0)
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Delete unreferenced blobs from storage")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    parser.add_argument("--grace-hours", type=float, help="Keep unreferenced blobs younger than this")
+    args = parser.parse_args()
+
+    # Run the async main function
+    asyncio.run(main(dry_run=args.dry_run, grace_hours=args.grace_hours))
@@ -31,6 +31,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db.session import Database, init_db
 from app.core.security import get_password_hash
+from app.core.config import settings
+from app.core.utils import make_excerpt
 from app.models.enums import UserRole
 
 
@@ -218,6 +220,7 @@ class MockDataCreator:
                 "_id": ObjectId(),
                 "title": question_info["title"],
                 "content": question_info["content"],
+                "excerpt": make_excerpt(question_info["content"], settings.QUESTION_EXCERPT_LENGTH),
                 "tags": question_info["tags"],
                 "author_id": author["_id"],
                 "author_name": f"{author['first_name']} {author['last_name']}",
@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 """
 Script to initialize database indexes.
+
+Applies the declarative specs in app/db/indexes.py: missing indexes are
+created, extra or conflicting ones are reported. Safe to run repeatedly.
+
+Usage:
+    python scripts/init_indexes.py [--dry-run]
 """
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -10,39 +17,31 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.core.config import settings
-from app.db.session import Database, get_collection
+from app.db.session import Database
+from app.db.indexes import ensure_indexes
 
-async def create_indexes():
+async def create_indexes(dry_run: bool = False):
     """
-    Create necessary database indexes
+    Create necessary database indexes and print the diff against the live DB
     """
-    # Users collection indexes
-    users = get_collection("users")
-    
-    # Create unique index on email
-    await users.create_index("email", unique=True)
-    
-    # Create index on role for faster role-based queries
-    await users.create_index("role")
+    report = await ensure_indexes(Database.db, dry_run=dry_run)
     
-    # Create index on is_active for faster filtering of active users
-    await users.create_index("is_active")
+    for collection_name, entry in report.items():
+        print(f"[{collection_name}]")
+        for key in ("created", "missing", "conflicting", "extra", "failed"):
+            if key == "missing" and not dry_run:
+                continue
+            if entry[key]:
+                print(f"  {key}: {', '.join(entry[key])}")
     
-    # Create text index for search
-    await users.create_index([
-        ("email", "text"),
-        ("first_name", "text"),
-        ("last_name", "text")
-    ])
+    if dry_run:
+        print("Dry run: no indexes were created")
+    else:
+        print("Database indexes created successfully")
     
-    # Add indexes for other collections as needed
-    # files = get_collection("files")
-    # await files.create_index("user_id")
-    # await files.create_index("created_at")
-    
-    print("Database indexes created successfully")
+    return report
 
-async def main():
+async def main(dry_run: bool = False):
     """
     Main function to run the script
     """
@@ -51,7 +50,7 @@ async def main():
     
     try:
         # Create indexes
-        await create_indexes()
+        report = await create_indexes(dry_run=dry_run)
     except Exception as e:
         print(f"Error creating indexes: {str(e)}")
         sys.exit(1)
@@ -59,6 +58,10 @@ async def main():
         # Close database connection
         await Database.close_mongo_connection()
     
+    if any(entry["failed"] for entry in report.values()):
+        print("Some indexes could not be created")
+        sys.exit(1)
+    
     print("Database initialization completed successfully")
     sys.exit(0)
 
@@ -67,5 +70,9 @@ if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
     
+    parser = argparse.ArgumentParser(description="Apply the declarative index specs")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the diff against the live database")
+    args = parser.parse_args()
+    
     # Run the async main function
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main(dry_run=args.dry_run))
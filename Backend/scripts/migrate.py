@@ -6,6 +6,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.db.session import Database
+from app.db.indexes import ensure_indexes
+from app.crud.crud_question import question as crud_question
 from app.core.config import settings
 
 async def run_migrations():
@@ -17,14 +19,12 @@ async def run_migrations():
         # Get the database
         db = Database.db
         
-        # Example migration: Create indexes
-        users_collection = db["users"]
+        # Indexes are declared in app/db/indexes.py; apply any that are missing
+        await ensure_indexes(db)
         
-        # Create index on email field (unique)
-        await users_collection.create_index("email", unique=True)
-        
-        # Create index on created_at field
-        await users_collection.create_index("created_at")
+        # List endpoints read a stored excerpt instead of the question body
+        backfilled = await crud_question.backfill_excerpts()
+        print(f"Stored excerpts for {backfilled} question(s)")
         
         print("Migrations completed successfully!")
         
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script to reconcile the uploads collection with the storage container.
+
+Adds records for blobs that have none, removes records whose blob is gone
+and corrects size/content type drift. Safe to run repeatedly.
+
+Usage:
+    python scripts/reconcile_uploads.py [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import Database
+from app.services.storage import storage
+from app.services.upload_reconciler import reconcile_uploads
+
+async def main(dry_run: bool = False):
+    """
+    Main function to run the script
+    """
+    # Initialize database and storage connections
+    await Database.connect_to_mongo()
+    await storage.connect()
+
+    try:
+        report = await reconcile_uploads(dry_run=dry_run)
+    except Exception as e:
+        print(f"Error reconciling uploads: {str(e)}")
+        sys.exit(1)
+    finally:
+        await storage.close()
+        await Database.close_mongo_connection()
+
+    print(f"Blobs scanned: {report['blobs']}, records scanned: {report['records']}")
+    print(f"Added: {report['added']}, removed: {report['removed']}, updated: {report['updated']}")
+    print(f"Unrecorded blobs too recent to adopt: {report['recent']}")
+    if dry_run:
+        print("Dry run: no records were changed")
+    sys.exit(0)
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Reconcile upload records with blob storage")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the drift")
+    args = parser.parse_args()
+
+    # Run the async main function
+    asyncio.run(main(dry_run=args.dry_run))